@@ -1,3 +1,8 @@
-from .ollama_embedder import get_ollama_embedder
+from .ollama_embedder import (
+    BatchedOllamaEmbeddings,
+    MultiNodeOllamaEmbeddings,
+    get_ollama_embedder
+)
+from . import state
 
-__all__ = ['get_ollama_embedder']
\ No newline at end of file
+__all__ = ['BatchedOllamaEmbeddings', 'MultiNodeOllamaEmbeddings', 'get_ollama_embedder', 'state']
\ No newline at end of file
@@ -1,28 +1,374 @@
-from langchain_ollama import OllamaEmbeddings
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
-import sys
-sys.path.append('/app/shared')
-from config import settings, get_ollama_url
-from logger import get_logger
+import httpx
+import numpy as np
+import redis
+from cachetools import LRUCache
+from langchain_core.embeddings import Embeddings
+
+from shared.config import settings, get_ollama_urls
+from shared.logger import get_logger
+from shared.redis_queue import get_redis_connection_pool
 
 logger = get_logger(__name__)
 
+CacheKey = Tuple[str, str]
+
+# Embedding cache keyed by (model, sha256(text)); the in-process LRU sits
+# in front of a Redis cache shared by all embedding workers. Both hold
+# encoded vectors (see _encode_vector), and cache hits are what gets stored
+# in Weaviate, so only the default float32 encoding keeps stored vectors at
+# full precision
+_cache: Optional[LRUCache] = (
+    LRUCache(maxsize=settings.EMBED_CACHE_SIZE) if settings.EMBED_CACHE_SIZE > 0 else None
+)
+_redis: Optional[redis.Redis] = None
+
+# Thread pool shared by every multi-node embedder in this process,
+# kept at module scope so it survives across RQ jobs
+_executor: Optional[ThreadPoolExecutor] = None
 
-def get_ollama_embedder() -> OllamaEmbeddings:
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
     """
-    Get configured Ollama embeddings instance
+    Get or create the module-level embedding thread pool
+    
+    Args:
+        max_workers: Number of worker threads
+    
+    Returns:
+        ThreadPoolExecutor instance
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ollama-embed"
+        )
+    return _executor
+
+
+def _get_redis() -> redis.Redis:
+    """
+    Get the binary-safe Redis connection used by the embedding cache
+    """
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis(connection_pool=get_redis_connection_pool(decode_responses=False))
+    return _redis
+
+
+def _cache_key(model: str, text: str) -> CacheKey:
+    """
+    Build the embedding cache key for a text
+    """
+    return (model, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+def _redis_key(key: CacheKey) -> str:
+    """
+    Build the Redis key for an embedding cache key
+    The encoding is part of the key so toggling quantization never
+    decodes entries written in the other format
+    """
+    encoding = "q8" if settings.EMBED_CACHE_QUANTIZED else "f32"
+    return f"emb:{key[0]}:{encoding}:{key[1]}"
+
+
+def _encode_vector(vector: np.ndarray) -> bytes:
+    """
+    Encode a vector for the cache
+    Quantized vectors are stored as a float32 scale followed by int8
+    components, a quarter of the float32 size. Each component is then off
+    by at most max(|v|) / 254, which typically keeps cosine similarity to
+    the original above 0.999 but can reorder near-tied search results
+    
+    Args:
+        vector: float32 embedding vector
+    
+    Returns:
+        Encoded bytes
+    """
+    if not settings.EMBED_CACHE_QUANTIZED:
+        return vector.tobytes()
+    
+    scale = float(np.max(np.abs(vector))) / 127 or 1.0
+    quantized = np.round(vector / scale).astype(np.int8)
+    return np.float32(scale).tobytes() + quantized.tobytes()
+
+
+def _decode_vector(value: bytes) -> np.ndarray:
+    """
+    Decode a cached vector back to float32
+    
+    Args:
+        value: Encoded bytes
     
     Returns:
-        OllamaEmbeddings instance
+        float32 embedding vector
+    """
+    if not settings.EMBED_CACHE_QUANTIZED:
+        return np.frombuffer(value, dtype=np.float32)
+    
+    scale = np.frombuffer(value, dtype=np.float32, count=1)[0]
+    return np.frombuffer(value, dtype=np.int8, offset=4).astype(np.float32) * scale
+
+
+def _cache_get_many(keys: List[CacheKey]) -> List[Optional[np.ndarray]]:
     """
-    logger.info(f"Initializing OllamaEmbeddings with model: {settings.OLLAMA_MODEL}")
-    logger.info(f"Ollama base URL: {get_ollama_url()}")
+    Look up embeddings in the LRU, then in Redis for LRU misses
+    
+    Args:
+        keys: Cache keys
     
-    embeddings = OllamaEmbeddings(
-        model=settings.OLLAMA_MODEL,
-        base_url=get_ollama_url(),
+    Returns:
+        Cached vectors, None for misses
+    """
+    values = [_cache.get(key) if _cache is not None else None for key in keys]
+    
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing and settings.EMBED_CACHE_TTL > 0:
+        try:
+            found = _get_redis().mget([_redis_key(keys[i]) for i in missing])
+        except redis.RedisError as e:
+            logger.warning("Embedding cache lookup failed: %s", e)
+            found = [None] * len(missing)
+        
+        for i, value in zip(missing, found):
+            if value is not None:
+                values[i] = value
+                if _cache is not None:
+                    _cache[keys[i]] = value
+    
+    return [_decode_vector(value) if value is not None else None for value in values]
+
+
+def _cache_set_many(entries: Dict[CacheKey, np.ndarray]):
+    """
+    Store embeddings in the LRU and in Redis with a TTL
+    
+    Args:
+        entries: Vectors by cache key
+    """
+    encoded = {key: _encode_vector(vector) for key, vector in entries.items()}
+    
+    if _cache is not None:
+        _cache.update(encoded)
+    
+    if settings.EMBED_CACHE_TTL <= 0:
+        return
+    
+    try:
+        pipe = _get_redis().pipeline(transaction=False)
+        for key, value in encoded.items():
+            pipe.setex(_redis_key(key), settings.EMBED_CACHE_TTL, value)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Embedding cache write failed: %s", e)
+
+
+def _create_http_client() -> httpx.Client:
+    """
+    Create a keep-alive HTTP client for one Ollama replica
+    """
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=40),
+        timeout=httpx.Timeout(300, connect=10),
     )
+
+
+class BatchedOllamaEmbeddings(Embeddings):
+    """
+    Ollama embeddings client using the batched /api/embed endpoint
+    Sends texts in batches of EMBED_BATCH_SIZE instead of one request per text
+    """
+    
+    def __init__(self, model: str, base_url: str, batch_size: int = None):
+        """
+        Initialize batched embedder
+        
+        Args:
+            model: Ollama model name
+            base_url: Ollama API base URL
+            batch_size: Number of texts sent per request
+        """
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size or settings.EMBED_BATCH_SIZE
+        
+        # Model options sent with every request (CPU threads for inference)
+        self.options = {"num_thread": settings.OLLAMA_NUM_THREAD} if settings.OLLAMA_NUM_THREAD else None
+        
+        # Keep-alive clients reused for every batch, one per replica
+        self.clients = {self.base_url: _create_http_client()}
+    
+    def _embed_batch(self, texts: List[str], base_url: str = None) -> List[List[float]]:
+        """
+        Embed a single batch of texts with one /api/embed call
+        
+        Args:
+            texts: Texts to embed
+            base_url: Replica to send the batch to (defaults to base_url)
+        
+        Returns:
+            List of embedding vectors
+        """
+        base_url = base_url or self.base_url
+        payload = {"model": self.model, "input": texts}
+        if self.options:
+            payload["options"] = self.options
+        response = self.clients[base_url].post(f"{base_url}/api/embed", json=payload)
+        response.raise_for_status()
+        return response.json()["embeddings"]
+    
+    def _split_batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Split texts into request-sized batches
+        """
+        return [
+            texts[start:start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+    
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in batches, bypassing the cache
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            List of embedding vectors in input order
+        """
+        embeddings = []
+        for batch in self._split_batches(texts):
+            embeddings.extend(self._embed_batch(batch))
+        return embeddings
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, sending only cache misses to Ollama
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            List of embedding vectors in input order
+        """
+        keys = [_cache_key(self.model, text) for text in texts]
+        vectors = _cache_get_many(keys)
+        
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Embed each distinct missing text once
+            pending = {}
+            for i in missing:
+                pending.setdefault(keys[i], texts[i])
+            
+            embedded = self._embed_texts(list(pending.values()))
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(pending.keys(), embedded)
+            }
+            _cache_set_many(fresh)
+            
+            for i in missing:
+                vectors[i] = fresh[keys[i]]
+        
+        logger.info("Embedding cache hits: %s/%s", len(texts) - len(missing), len(texts))
+        return [vector.tolist() for vector in vectors]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query text
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Embedding vector
+        """
+        return self._embed_batch([text])[0]
+
+
+class MultiNodeOllamaEmbeddings(BatchedOllamaEmbeddings):
+    """
+    Batched Ollama embeddings spread across several Ollama replicas
+    Ollama serializes requests per model instance, so batches are
+    dispatched round-robin to all replicas concurrently
+    """
+    
+    def __init__(self, model: str, base_urls: List[str], batch_size: int = None):
+        """
+        Initialize multi-node embedder
+        
+        Args:
+            model: Ollama model name
+            base_urls: Ollama API base URLs, one per replica
+            batch_size: Number of texts sent per request
+        """
+        if not base_urls:
+            raise ValueError("At least one Ollama URL is required")
+        
+        super().__init__(model, base_urls[0], batch_size)
+        self.base_urls = [url.rstrip("/") for url in base_urls]
+        for url in self.base_urls[1:]:
+            self.clients[url] = _create_http_client()
+    
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in batches spread across replicas, bypassing the cache
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            List of embedding vectors in input order
+        """
+        batches = self._split_batches(texts)
+        if len(batches) <= 1:
+            return super()._embed_texts(texts)
+        
+        pool = _get_executor(2 * len(self.base_urls))
+        futures = [
+            pool.submit(self._embed_batch, batch, self.base_urls[i % len(self.base_urls)])
+            for i, batch in enumerate(batches)
+        ]
+        
+        # Collect in submission order to preserve input order
+        embeddings = []
+        for future in futures:
+            embeddings.extend(future.result())
+        return embeddings
+
+
+def get_ollama_embedder() -> BatchedOllamaEmbeddings:
+    """
+    Get configured Ollama embeddings instance
+    
+    Returns:
+        MultiNodeOllamaEmbeddings when several replicas are configured,
+        otherwise BatchedOllamaEmbeddings
+    """
+    urls = get_ollama_urls()
+    
+    logger.info("Initializing Ollama embeddings with model: %s", settings.OLLAMA_MODEL)
+    logger.info("Ollama base URLs: %s (batch size: %s)", ', '.join(urls), settings.EMBED_BATCH_SIZE)
+    
+    if len(urls) > 1:
+        embeddings = MultiNodeOllamaEmbeddings(
+            model=settings.OLLAMA_MODEL,
+            base_urls=urls,
+        )
+    else:
+        embeddings = BatchedOllamaEmbeddings(
+            model=settings.OLLAMA_MODEL,
+            base_url=urls[0],
+        )
     
-    logger.info("OllamaEmbeddings initialized successfully")
+    logger.info("%s initialized successfully", type(embeddings).__name__)
     
-    return embeddings
\ No newline at end of file
+    return embeddings
@@ -0,0 +1,45 @@
+"""
+Worker-process state shared across embedding jobs
+Holds the embedder and Weaviate client so they are built once per process
+"""
+from typing import Optional
+
+import weaviate
+
+from shared.vector_store import get_weaviate_client, init_weaviate_schema, check_weaviate_client
+
+from .ollama_embedder import BatchedOllamaEmbeddings, get_ollama_embedder
+
+embedder: Optional[BatchedOllamaEmbeddings] = None
+weaviate_client: Optional[weaviate.WeaviateClient] = None
+
+
+def get_embedder() -> BatchedOllamaEmbeddings:
+    """
+    Get the process-wide embedder, creating it on first use
+    """
+    global embedder
+    if embedder is None:
+        embedder = get_ollama_embedder()
+    return embedder
+
+
+def get_client() -> weaviate.WeaviateClient:
+    """
+    Get the process-wide Weaviate client, creating it on first use
+    """
+    global weaviate_client
+    if weaviate_client is None:
+        weaviate_client = get_weaviate_client()
+        init_weaviate_schema(weaviate_client)
+    return weaviate_client
+
+
+def reset_client_if_unready():
+    """
+    Drop the Weaviate client after a failure if it can no longer reach
+    Weaviate, so the next job reconnects
+    """
+    global weaviate_client
+    if weaviate_client is not None and not check_weaviate_client(weaviate_client):
+        weaviate_client = None
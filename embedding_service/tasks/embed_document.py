@@ -1,22 +1,120 @@
-from typing import Dict, Any, List
-import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from uuid import NAMESPACE_URL, uuid5
+import orjson
 
-import sys
-sys.path.append('/app/shared')
-from config import settings
-from logger import get_logger
-from database import update_document_status, get_document
-from vector_store import get_vector_store, add_documents_to_vectorstore
+from shared.config import settings
+from shared.logger import get_logger
+from shared.database import update_document_status, get_document
+from shared.vector_store import add_embeddings_to_vectorstore, delete_document_chunks
+from shared.redis_queue import finish_embedding_batch
 
-from models import get_ollama_embedder
+from models import state
 from langchain_core.documents import Document
 
 logger = get_logger(__name__)
 
 
+def _parse_chunk_metadata(chunk_metadata: Any) -> Dict[str, Any]:
+    """
+    Parse chunk metadata stored as a JSON string
+    
+    Args:
+        chunk_metadata: Metadata dict, or JSON string/bytes
+    
+    Returns:
+        Scalar metadata fields (empty if it cannot be parsed)
+    """
+    if isinstance(chunk_metadata, (bytes, str)):
+        try:
+            chunk_metadata = orjson.loads(chunk_metadata)
+        except orjson.JSONDecodeError:
+            return {}
+    
+    # Only scalar fields become Weaviate properties; nested extraction
+    # metadata (e.g. pdf_metadata) stays in SQLite
+    return {
+        key: value for key, value in chunk_metadata.items()
+        if isinstance(value, (str, int, float, bool))
+    }
+
+
+def _chunk_uuid(document_id: str, chunk_id: str) -> str:
+    """
+    Derive a deterministic Weaviate object UUID for a chunk, so a retried
+    task overwrites its earlier objects instead of duplicating them
+    
+    Args:
+        document_id: Document ID
+        chunk_id: Chunk ID
+    
+    Returns:
+        UUID string
+    """
+    return str(uuid5(NAMESPACE_URL, f"{document_id}:{chunk_id}"))
+
+
+def _embed_group(embedder, documents: List[Document]) -> Tuple[List[str], List[List[float]]]:
+    """
+    Embed the texts of a group of documents
+    
+    Args:
+        embedder: Embeddings instance
+        documents: LangChain documents
+    
+    Returns:
+        Tuple of (texts, embeddings)
+    """
+    texts = [doc.page_content for doc in documents]
+    return texts, embedder.embed_documents(texts)
+
+
+def embed_and_store(embedder, client, documents: List[Document]) -> List[str]:
+    """
+    Embed documents and store the vectors in Weaviate as a two-stage pipeline
+    A background thread embeds the next group of EMBED_PIPELINE_SIZE chunks
+    while the current group is inserted
+    
+    Args:
+        embedder: Embeddings instance
+        client: Weaviate client
+        documents: LangChain documents
+    
+    Returns:
+        List of stored object IDs
+    """
+    size = settings.EMBED_PIPELINE_SIZE
+    groups = [documents[start:start + size] for start in range(0, len(documents), size)]
+    
+    vector_ids = []
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-pipeline") as producer:
+        pending = producer.submit(_embed_group, embedder, groups[0])
+        
+        for index, group in enumerate(groups):
+            texts, embeddings = pending.result()
+            
+            # Start embedding the next group before inserting this one
+            if index + 1 < len(groups):
+                pending = producer.submit(_embed_group, embedder, groups[index + 1])
+            
+            vector_ids.extend(add_embeddings_to_vectorstore(
+                client=client,
+                texts=texts,
+                embeddings=embeddings,
+                metadatas=[doc.metadata for doc in group],
+                ids=[
+                    _chunk_uuid(doc.metadata["document_id"], doc.metadata["chunk_id"])
+                    for doc in group
+                ]
+            ))
+            logger.info("Stored pipeline stage %s/%s (%s chunks)", index + 1, len(groups), len(group))
+    
+    return vector_ids
+
+
 def embed_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Generate embeddings and store in Weaviate
+    Generate embeddings for one batch of a document's chunks and store in Weaviate
     
     This is the main task executed by RQ worker
     
@@ -31,68 +129,71 @@ def embed_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
     document_id = job_data.get("document_id")
     chunks = job_data.get("chunks", [])
     
-    logger.info(f"Starting embedding generation for document: {document_id}")
-    logger.info(f"Number of chunks to embed: {len(chunks)}")
+    logger.info("Starting embedding generation for document: %s", document_id)
+    logger.info("Number of chunks to embed: %s", len(chunks))
     
     try:
         if not chunks:
             raise ValueError("No chunks provided for embedding")
         
-        # Step 1: Initialize Ollama embedder
-        logger.info("Initializing Ollama embedder...")
-        embedder = get_ollama_embedder()
+        # Step 1: Get Ollama embedder (built once per worker process)
+        embedder = state.get_embedder()
         
         # Step 2: Get document metadata
         doc_metadata = get_document(document_id)
         if not doc_metadata:
             raise ValueError(f"Document not found: {document_id}")
         
+        # A failed document keeps no vectors, so its remaining batches are skipped
+        if doc_metadata["status"] == "failed":
+            logger.info("Skipping embedding for failed document: %s", document_id)
+            return {"document_id": document_id, "status": "skipped", "num_embeddings": 0}
+        
         # Step 3: Prepare documents for embedding
         logger.info("Preparing documents for embedding...")
-        langchain_docs = []
-        
-        for chunk in chunks:
-            # Parse metadata if it's a string
-            chunk_metadata = chunk.get("metadata", {})
-            if isinstance(chunk_metadata, str):
-                try:
-                    chunk_metadata = json.loads(chunk_metadata)
-                except:
-                    chunk_metadata = {}
-            
-            # Create metadata for vector store
-            metadata = {
-                "document_id": document_id,
-                "chunk_id": chunk["chunk_id"],
-                "chunk_index": chunk["chunk_index"],
-                "filename": doc_metadata.get("filename", ""),
-                "file_type": doc_metadata.get("file_type", ""),
-                **chunk_metadata
-            }
-            
-            # Create LangChain Document
-            doc = Document(
+        # Document-level fields shared by every chunk
+        base_metadata = {
+            "document_id": document_id,
+            "filename": doc_metadata.get("filename", ""),
+            "file_type": doc_metadata.get("file_type", ""),
+        }
+        
+        langchain_docs = [
+            Document(
                 page_content=chunk["chunk_text"],
-                metadata=metadata
+                metadata={
+                    **base_metadata,
+                    "chunk_id": chunk["chunk_id"],
+                    "chunk_index": chunk["chunk_index"],
+                    **_parse_chunk_metadata(chunk.get("metadata", {}))
+                }
             )
-            langchain_docs.append(doc)
+            for chunk in chunks
+        ]
+        
+        # Step 4: Get Weaviate client (built once per worker process)
+        client = state.get_client()
         
-        # Step 4: Initialize vector store
-        logger.info("Initializing vector store...")
-        vector_store = get_vector_store(embedder)
+        # Step 5: Generate embeddings and store pre-computed vectors, overlapping
+        # embedding of the next group with insertion of the current one
+        logger.info("Generating and storing embeddings for %s chunks...", len(langchain_docs))
+        vector_ids = embed_and_store(embedder, client, langchain_docs)
         
-        # Step 5: Add documents to vector store (embeddings generated automatically)
-        logger.info("Generating embeddings and storing in Weaviate...")
-        vector_ids = add_documents_to_vectorstore(
-            vector_store=vector_store,
-            documents=langchain_docs
-        )
+        logger.info("Successfully stored %s embeddings in Weaviate", len(vector_ids))
         
-        logger.info(f"Successfully stored {len(vector_ids)} embeddings in Weaviate")
+        # The document may have failed while this batch was embedded; its
+        # cleanup job may already have run, so remove the vectors here
+        doc_metadata = get_document(document_id)
+        if doc_metadata and doc_metadata["status"] == "failed":
+            delete_document_chunks(document_id, client=client)
+            logger.info("Document failed during embedding, vectors removed: %s", document_id)
+            return {"document_id": document_id, "status": "skipped", "num_embeddings": 0}
         
-        # Step 6: Update document status to completed
-        update_document_status(document_id, "completed")
-        logger.info(f"Document status updated to completed: {document_id}")
+        # Step 6: Mark the document completed once its last batch is stored
+        # (a failed batch never finishes, so a failed document stays failed)
+        if finish_embedding_batch(document_id):
+            update_document_status(document_id, "completed")
+            logger.info("Document status updated to completed: %s", document_id)
         
         # Step 7: Return result
         result = {
@@ -101,7 +202,7 @@ def embed_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
             "num_embeddings": len(vector_ids),
         }
         
-        logger.info(f"Embedding generation complete: {document_id}")
+        logger.info("Embedding generation complete: %s", document_id)
         return result
         
     except Exception as e:
@@ -109,4 +210,38 @@ def embed_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
         error_message = f"Embedding failed: {str(e)}"
         logger.error(error_message, exc_info=True)
         update_document_status(document_id, "failed", error_message)
-        raise
\ No newline at end of file
+        
+        # A dead connection (e.g. Weaviate restarted) must not be reused
+        state.reset_client_if_unready()
+        
+        # Drop the vectors earlier batches stored; batches still running
+        # remove their own once they see the failed status
+        try:
+            delete_document_chunks(document_id, client=state.get_client())
+        except Exception as cleanup_error:
+            logger.error("Failed to delete vectors for %s: %s", document_id, cleanup_error)
+        raise
+
+
+def delete_document_vectors_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Delete every vector stored for a document
+    Queued when processing fails after some embedding batches were queued
+    
+    Args:
+        job_data: Dictionary containing:
+            - document_id: Document ID
+    
+    Returns:
+        Result dictionary with the number of deleted vectors
+    """
+    document_id = job_data.get("document_id")
+    
+    logger.info("Deleting vectors for document: %s", document_id)
+    deleted = delete_document_chunks(document_id, client=state.get_client())
+    
+    return {
+        "document_id": document_id,
+        "status": "deleted",
+        "num_deleted": deleted,
+    }
@@ -4,51 +4,73 @@ Embedding Service Worker
 Consumes jobs from Redis queue and generates embeddings
 """
 import sys
-sys.path.append('/app/shared')
 
-from rq import Worker, Queue
+from rq import SimpleWorker, Queue
+from rq.worker_pool import WorkerPool
 from redis import Redis
 
-from config import settings, get_redis_url
-from logger import get_logger
+from shared.config import settings, get_redis_url
+from shared.logger import get_logger
+from shared.redis_queue import get_redis_connection_pool
+
+from models import state
 
 logger = get_logger(__name__)
 
 
+class EmbeddingWorker(SimpleWorker):
+    """
+    RQ worker that runs jobs in-process so the cached embedder and
+    Weaviate client are reused across jobs
+    """
+    
+    def work(self, *args, **kwargs):
+        # Build embedder and Weaviate client once per worker process,
+        # after the pool has forked so no connection is shared
+        logger.info("Initializing embedder and Weaviate client...")
+        state.get_embedder()
+        state.get_client()
+        return super().work(*args, **kwargs)
+
+
 def main():
     """
-    Start RQ worker for embedding queue
+    Start RQ worker pool for embedding queue
     """
     try:
+        num_workers = settings.EMBED_WORKER_CONCURRENCY
+        
         logger.info("Starting Embedding Worker...")
-        logger.info(f"Queue: {settings.QUEUE_EMBEDDING}")
-        logger.info(f"Redis URL: {get_redis_url()}")
-        logger.info(f"Ollama Model: {settings.OLLAMA_MODEL}")
+        logger.info("Queue: %s", settings.QUEUE_EMBEDDING)
+        logger.info("Redis URL: %s", get_redis_url())
+        logger.info("Ollama Model: %s", settings.OLLAMA_MODEL)
+        logger.info("Worker processes: %s", num_workers)
         
-        # Connect to Redis
-        redis_conn = Redis.from_url(get_redis_url())
+        # Connect to Redis through the shared pool; RQ needs raw responses
+        redis_conn = Redis(connection_pool=get_redis_connection_pool(decode_responses=False))
         
         # Create queue
         queue = Queue(settings.QUEUE_EMBEDDING, connection=redis_conn)
         
-        logger.info(f"Connected to Redis. Queue size: {len(queue)}")
+        logger.info("Connected to Redis. Queue size: %s", len(queue))
         
-        # Create worker
-        worker = Worker(
+        # Create worker pool
+        worker_pool = WorkerPool(
             [queue],
             connection=redis_conn,
-            name=f"embedding-worker-{settings.ENVIRONMENT}"
+            num_workers=num_workers,
+            worker_class=EmbeddingWorker
         )
         
-        logger.info("Worker ready. Waiting for jobs...")
+        logger.info("Worker pool ready. Waiting for jobs...")
         
-        # Start worker (blocking call)
-        worker.work(with_scheduler=True)
+        # Start worker pool (blocking call)
+        worker_pool.start()
         
     except KeyboardInterrupt:
         logger.info("Worker interrupted by user")
     except Exception as e:
-        logger.error(f"Worker error: {str(e)}", exc_info=True)
+        logger.error("Worker error: %s", e, exc_info=True)
         sys.exit(1)
 
 
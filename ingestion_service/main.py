@@ -1,12 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-import sys
-sys.path.append('/app/shared')
-from logger import get_logger
-from config import settings
-from database import init_database
+from shared.logger import get_logger
+from shared.config import settings
+from shared.database import init_database
 
 from routes import ingest, health
 
@@ -20,8 +19,8 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting Ingestion Service...")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Upload directory: {settings.UPLOAD_DIR}")
+    logger.info("Environment: %s", settings.ENVIRONMENT)
+    logger.info("Upload directory: %s", settings.UPLOAD_DIR)
     
     # Initialize database on startup
     try:
@@ -29,7 +28,7 @@ async def lifespan(app: FastAPI):
         init_database()
         logger.info("Database initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         # Don't fail startup, just log the error
     
     yield
@@ -43,7 +42,8 @@ app = FastAPI(
     title="Document Ingestion Service",
     description="Microservice for uploading and queuing documents for processing",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
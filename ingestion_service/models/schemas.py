@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -42,6 +42,12 @@ class IngestResponse(BaseModel):
         }
 
 
+class BatchIngestResponse(BaseModel):
+    """Response model for multi-file document ingestion"""
+    num_documents: int
+    documents: List[IngestResponse]
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     error: str
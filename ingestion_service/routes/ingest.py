@@ -1,20 +1,19 @@
 import os
-import uuid
+import secrets
 import aiofiles
 from pathlib import Path
+from typing import Any, Dict, List
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
 from fastapi.responses import JSONResponse
 
-from models.schemas import IngestResponse, ErrorResponse, FileType, DocumentStatus
+from models.schemas import IngestResponse, BatchIngestResponse, ErrorResponse, FileType, DocumentStatus
 
 # These will be imported from shared module later
-import sys
-sys.path.append('/app/shared')
-from config import settings
-from database import create_document_record
-from redis_queue import enqueue_processing_job
-from logger import get_logger
+from shared.config import settings
+from shared.database import create_document_record, update_document_status
+from shared.redis_queue import enqueue_processing_job, enqueue_processing_jobs
+from shared.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -23,6 +22,127 @@ logger = get_logger(__name__)
 UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 MAX_FILE_SIZE = settings.MAX_FILE_SIZE  # 50MB in bytes
 ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+UPLOAD_CHUNK_SIZE = 1 << 20  # Stream uploads to disk 1MB at a time
+
+
+async def _save_upload(file: UploadFile) -> Dict[str, Any]:
+    """
+    Validate an uploaded file and stream it to the upload directory
+    
+    Args:
+        file: Uploaded PDF or DOCX file
+    
+    Returns:
+        Document metadata for the SQLite record
+    """
+    # Validate file extension
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        logger.warning("Invalid file type attempted: %s", file_ext)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type. Only PDF and DOCX files are supported. Got: {file_ext}"
+        )
+    
+    # Determine file type
+    file_type = FileType.PDF if file_ext == '.pdf' else FileType.DOCX
+    
+    # Generate unique document ID
+    document_id = f"doc_{secrets.token_urlsafe(9)}"
+    upload_time = datetime.now()
+    
+    # Stream file to upload directory, validating size as we go
+    # Create safe filename with document_id
+    safe_filename = f"{document_id}_{Path(file.filename).name}"
+    file_path = UPLOAD_DIR / safe_filename
+    
+    # Ensure upload directory exists
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    
+    file_size = 0
+    try:
+        async with aiofiles.open(file_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    logger.warning("File too large: %s (over %s bytes)", file.filename, MAX_FILE_SIZE)
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)}MB"
+                    )
+                await f.write(chunk)
+        
+        if file_size == 0:
+            logger.warning("Empty file uploaded: %s", file.filename)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty"
+            )
+    except Exception:
+        # Don't leave partial or rejected uploads behind
+        file_path.unlink(missing_ok=True)
+        raise
+    
+    logger.info("File saved: %s (%s bytes)", safe_filename, file_size)
+    
+    return {
+        "document_id": document_id,
+        "filename": file.filename,
+        "file_path": str(file_path),
+        "file_type": file_type.value,
+        "file_size": file_size,
+        "status": DocumentStatus.UPLOADED.value,
+        "upload_time": upload_time
+    }
+
+
+def _job_data(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the processing job payload for a document
+    """
+    return {
+        "document_id": metadata["document_id"],
+        "file_path": metadata["file_path"],
+        "file_type": metadata["file_type"]
+    }
+
+
+def _ingest_response(metadata: Dict[str, Any]) -> IngestResponse:
+    """
+    Build the ingestion response for a queued document
+    """
+    return IngestResponse(
+        document_id=metadata["document_id"],
+        filename=metadata["filename"],
+        file_type=metadata["file_type"],
+        file_size=metadata["file_size"],
+        status=DocumentStatus.UPLOADED.value,
+        message="Document uploaded successfully and queued for processing",
+        upload_time=metadata["upload_time"]
+    )
+
+
+def _discard_unqueued(saved: List[Dict[str, Any]], recorded: List[str]):
+    """
+    Clean up after an ingestion that failed before its jobs were queued
+    Nothing will process these documents, so their files are removed and
+    any records already created are marked failed
+    
+    Args:
+        saved: Metadata of the files saved to the upload directory
+        recorded: IDs of the documents whose records were created
+    """
+    for metadata in saved:
+        Path(metadata["file_path"]).unlink(missing_ok=True)
+    for document_id in recorded:
+        try:
+            update_document_status(
+                document_id,
+                DocumentStatus.FAILED.value,
+                "Ingestion failed before the document was queued"
+            )
+        except Exception as e:
+            logger.error("Failed to mark document %s as failed: %s", document_id, e)
 
 
 @router.post("/ingest", response_model=IngestResponse, status_code=status.HTTP_201_CREATED)
@@ -33,96 +153,87 @@ async def ingest_document(
     Ingest a document (PDF or DOCX) for processing.
     
     Steps:
-    1. Validate file type and size
-    2. Save file to upload directory
+    1. Validate file type
+    2. Stream file to upload directory, enforcing the size limit
     3. Create metadata record in SQLite
     4. Queue processing job in Redis
     5. Return document_id and status
     """
     
+    metadata = None
+    recorded = False
+    queued = False
     try:
-        # Step 1: Validate file extension
-        file_ext = Path(file.filename).suffix.lower()
-        if file_ext not in ALLOWED_EXTENSIONS:
-            logger.warning(f"Invalid file type attempted: {file_ext}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file type. Only PDF and DOCX files are supported. Got: {file_ext}"
-            )
-        
-        # Determine file type
-        file_type = FileType.PDF if file_ext == '.pdf' else FileType.DOCX
-        
-        # Step 2: Validate file size
-        # Read file content to check size
-        content = await file.read()
-        file_size = len(content)
-        
-        if file_size == 0:
-            logger.warning(f"Empty file uploaded: {file.filename}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File is empty"
-            )
-        
-        if file_size > MAX_FILE_SIZE:
-            logger.warning(f"File too large: {file.filename} ({file_size} bytes)")
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)}MB"
-            )
-        
-        # Step 3: Generate unique document ID
-        document_id = f"doc_{uuid.uuid4().hex[:12]}"
-        upload_time = datetime.now()
-        
-        # Step 4: Save file to upload directory
-        # Create safe filename with document_id
-        safe_filename = f"{document_id}_{Path(file.filename).name}"
-        file_path = UPLOAD_DIR / safe_filename
-        
-        # Ensure upload directory exists
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        # Step 1-2: Validate and save the file
+        metadata = await _save_upload(file)
+        document_id = metadata["document_id"]
         
-        # Write file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
-        
-        logger.info(f"File saved: {safe_filename} ({file_size} bytes)")
+        # Step 3: Create metadata record in SQLite
+        create_document_record(metadata)
+        recorded = True
+        logger.info("Document record created: %s", document_id)
         
-        # Step 5: Create metadata record in SQLite
-        metadata = {
-            "document_id": document_id,
-            "filename": file.filename,
-            "file_path": str(file_path),
-            "file_type": file_type.value,
-            "file_size": file_size,
-            "status": DocumentStatus.UPLOADED.value,
-            "upload_time": upload_time
-        }
+        # Step 4: Queue processing job
+        job_id = enqueue_processing_job(_job_data(metadata))
+        queued = True
+        logger.info("Processing job queued: %s for document %s", job_id, document_id)
         
-        create_document_record(metadata)
-        logger.info(f"Document record created: {document_id}")
+        # Step 5: Return response
+        return _ingest_response(metadata)
+    
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    
+    except Exception as e:
+        logger.error("Unexpected error during ingestion: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error during file ingestion: {str(e)}"
+        )
+    
+    finally:
+        if metadata is not None and not queued:
+            _discard_unqueued([metadata], [metadata["document_id"]] if recorded else [])
+
+
+@router.post("/ingest/batch", response_model=BatchIngestResponse, status_code=status.HTTP_201_CREATED)
+async def ingest_documents(
+    files: List[UploadFile] = File(..., description="PDF or DOCX files to ingest")
+):
+    """
+    Ingest several documents (PDF or DOCX) in one request.
+    
+    Every file is validated and saved before any is recorded, so a rejected
+    file fails the whole batch without leaving other files behind. The
+    processing jobs are then queued in a single Redis round trip; if the
+    batch fails before that, its files are removed and its records marked
+    failed.
+    """
+    
+    saved = []
+    recorded = []
+    queued = False
+    try:
+        # Step 1-2: Validate and save every file
+        for file in files:
+            saved.append(await _save_upload(file))
         
-        # Step 6: Queue processing job
-        job_data = {
-            "document_id": document_id,
-            "file_path": str(file_path),
-            "file_type": file_type.value
-        }
+        # Step 3: Create metadata records in SQLite
+        for metadata in saved:
+            create_document_record(metadata)
+            recorded.append(metadata["document_id"])
+        logger.info("Document records created: %s", len(recorded))
         
-        job_id = enqueue_processing_job(job_data)
-        logger.info(f"Processing job queued: {job_id} for document {document_id}")
+        # Step 4: Queue all processing jobs at once
+        job_ids = enqueue_processing_jobs([_job_data(metadata) for metadata in saved])
+        queued = True
+        logger.info("Processing jobs queued: %s", len(job_ids))
         
-        # Step 7: Return response
-        return IngestResponse(
-            document_id=document_id,
-            filename=file.filename,
-            file_type=file_type.value,
-            file_size=file_size,
-            status=DocumentStatus.UPLOADED.value,
-            message="Document uploaded successfully and queued for processing",
-            upload_time=upload_time
+        # Step 5: Return response
+        return BatchIngestResponse(
+            num_documents=len(saved),
+            documents=[_ingest_response(metadata) for metadata in saved]
         )
     
     except HTTPException:
@@ -130,8 +241,12 @@ async def ingest_document(
         raise
     
     except Exception as e:
-        logger.error(f"Unexpected error during ingestion: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during batch ingestion: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error during file ingestion: {str(e)}"
-        )
\ No newline at end of file
+        )
+    
+    finally:
+        if not queued:
+            _discard_unqueued(saved, recorded)
@@ -0,0 +1,64 @@
+"""
+Chunk boundary walk used by SemanticChunker
+Pure-Python fallback for chunk_walk.pyx; when the compiled extension is
+built (python setup.py build_ext --inplace) it is imported instead
+"""
+from bisect import bisect_left, bisect_right
+from typing import List, Sequence, Tuple
+
+
+def chunk_spans(
+    ends: Sequence[int],
+    ranks: Sequence[int],
+    text_len: int,
+    chunk_size: int,
+    chunk_overlap: int,
+    num_ranks: int,
+    start: int = 0,
+    end: int = 0
+) -> List[Tuple[int, int]]:
+    """
+    Walk separator offsets and pick chunk boundaries
+    Each chunk ends at the highest-priority separator past the previous
+    chunk's end that keeps it within chunk_size (the furthest one on ties),
+    or is cut at chunk_size when no separator fits. The next chunk starts
+    at the first separator inside the overlap window.
+    
+    Args:
+        ends: Sorted offsets just past each separator
+        ranks: Separator priority for each offset (lower is better)
+        text_len: Length of the text
+        chunk_size: Maximum chunk size in characters
+        chunk_overlap: Overlap between chunks
+        num_ranks: Number of separator ranks
+        start: Offset where the walk starts
+        end: End offset of the chunk before start (to resume a walk)
+    
+    Returns:
+        List of (start, end) offsets into the text
+    """
+    spans = []
+    while start < text_len:
+        limit = start + chunk_size
+        if limit >= text_len:
+            end = text_len
+        else:
+            # Best separator in (previous end, limit]; hard cut if there is none
+            lo = bisect_right(ends, max(start, end))
+            end = limit
+            best_rank = num_ranks
+            for i in range(lo, bisect_right(ends, limit)):
+                if ranks[i] <= best_rank:
+                    best_rank = ranks[i]
+                    end = ends[i]
+        
+        spans.append((start, end))
+        if end >= text_len:
+            break
+        
+        # Back off by chunk_overlap, snapping forward to a separator
+        i = bisect_left(ends, end - chunk_overlap)
+        next_start = ends[i] if i < len(ends) and ends[i] < end else end
+        start = next_start if next_start > start else end
+    
+    return spans
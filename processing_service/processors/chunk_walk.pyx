@@ -0,0 +1,86 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled chunk boundary walk used by SemanticChunker
+Mirrors chunk_walk.py with typed indices and buffer access
+"""
+
+
+cdef inline Py_ssize_t _bisect_left(const long long[:] a, long long x, Py_ssize_t lo, Py_ssize_t hi) nogil:
+    cdef Py_ssize_t mid
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if a[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+cdef inline Py_ssize_t _bisect_right(const long long[:] a, long long x, Py_ssize_t lo, Py_ssize_t hi) nogil:
+    cdef Py_ssize_t mid
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if x < a[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def chunk_spans(
+    const long long[:] ends,
+    const signed char[:] ranks,
+    Py_ssize_t text_len,
+    Py_ssize_t chunk_size,
+    Py_ssize_t chunk_overlap,
+    int num_ranks,
+    Py_ssize_t start=0,
+    Py_ssize_t end=0
+):
+    """
+    Walk separator offsets and pick chunk boundaries
+    See chunk_walk.py for the algorithm
+
+    Args:
+        ends: Sorted offsets just past each separator (array('q'))
+        ranks: Separator priority for each offset (array('b'))
+        text_len: Length of the text
+        chunk_size: Maximum chunk size in characters
+        chunk_overlap: Overlap between chunks
+        num_ranks: Number of separator ranks
+        start: Offset where the walk starts
+        end: End offset of the chunk before start (to resume a walk)
+
+    Returns:
+        List of (start, end) offsets into the text
+    """
+    cdef Py_ssize_t n = ends.shape[0]
+    cdef Py_ssize_t limit, lo, hi, i, next_start
+    cdef int best_rank
+
+    spans = []
+    while start < text_len:
+        limit = start + chunk_size
+        if limit >= text_len:
+            end = text_len
+        else:
+            # Best separator in (previous end, limit]; hard cut if there is none
+            lo = _bisect_right(ends, max(start, end), 0, n)
+            hi = _bisect_right(ends, limit, lo, n)
+            end = limit
+            best_rank = num_ranks
+            for i in range(lo, hi):
+                if ranks[i] <= best_rank:
+                    best_rank = ranks[i]
+                    end = ends[i]
+
+        spans.append((start, end))
+        if end >= text_len:
+            break
+
+        # Back off by chunk_overlap, snapping forward to a separator
+        i = _bisect_left(ends, end - chunk_overlap, 0, n)
+        next_start = ends[i] if i < n and ends[i] < end else end
+        start = next_start if next_start > start else end
+
+    return spans
@@ -1,10 +1,8 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import BinaryIO, Dict, Any, Iterator, List, Union
 from docx import Document
 
-import sys
-sys.path.append('/app/shared')
-from logger import get_logger
+from shared.logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -40,68 +38,138 @@ class DOCXProcessor:
         Returns:
             Dictionary containing extracted text and metadata
         """
-        try:
-            logger.info(f"Processing DOCX: {file_path}")
-            
-            doc = Document(file_path)
-            
-            # Extract metadata from core properties
-            metadata = {
-                "num_paragraphs": len(doc.paragraphs),
-                "num_tables": len(doc.tables),
-                "docx_metadata": {}
-            }
+        result = self.extract_text_stream(file_path, file_path)
+        return {
+            "text": "".join(result["text_iter"]),
+            "metadata": result["metadata"]
+        }
+    
+    def extract_text_stream(self, source: Union[str, BinaryIO], name: str = "<buffer>") -> Dict[str, Any]:
+        """
+        Extract text from a DOCX lazily, one paragraph or table row at a time
+        
+        Args:
+            source: Path to DOCX file, or the file opened in binary mode
+            name: File name used in log messages
             
-            # Get document properties if available
-            if doc.core_properties:
-                props = doc.core_properties
-                metadata["docx_metadata"] = {
-                    "title": props.title or "",
-                    "author": props.author or "",
-                    "subject": props.subject or "",
-                    "created": str(props.created) if props.created else "",
-                    "modified": str(props.modified) if props.modified else "",
-                }
+        Returns:
+            Dictionary containing metadata and "text_iter", an iterator of
+            text pieces that join to the same text extract_text returns
+        """
+        try:
+            logger.info("Processing DOCX: %s", name)
             
-            # Extract text from paragraphs
-            paragraphs = []
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if text:
-                    paragraphs.append(text)
+            doc = Document(source)
             
-            # Extract text from tables
-            table_texts = []
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join([cell.text.strip() for cell in row.cells])
-                    if row_text.strip():
-                        table_texts.append(row_text)
+            # python-docx rebuilds these lists from the XML on every access
+            doc_paragraphs = list(doc.paragraphs)
+            doc_tables = list(doc.tables)
             
-            # Combine all text
-            full_text = "\n\n".join(paragraphs)
+            metadata = self._read_metadata(doc, doc_paragraphs, doc_tables)
             
-            if table_texts:
-                full_text += "\n\n=== Tables ===\n\n" + "\n".join(table_texts)
+        except Exception as e:
+            logger.error("Failed to process DOCX %s: %s", name, e)
+            raise
+        
+        return {
+            "metadata": metadata,
+            "text_iter": self._iter_text(doc_paragraphs, doc_tables)
+        }
+    
+    def _iter_text(self, doc_paragraphs: List[Any], doc_tables: List[Any]) -> Iterator[str]:
+        """
+        Yield paragraph texts, then table rows, with the separators extract_text uses
+        
+        Args:
+            doc_paragraphs: Document paragraphs
+            doc_tables: Document tables
             
-            if not full_text.strip():
-                raise ValueError("No text content extracted from DOCX")
+        Yields:
+            Text pieces and the separators between them
+        """
+        num_paragraphs = 0
+        num_rows = 0
+        total_chars = 0
+        
+        for para in doc_paragraphs:
+            text = para.text.strip()
+            if not text:
+                continue
             
-            logger.info(
-                f"Successfully extracted {len(full_text)} characters "
-                f"from {len(paragraphs)} paragraphs and {len(doc.tables)} tables"
-            )
+            if num_paragraphs:
+                yield "\n\n"
+                total_chars += 2
+            num_paragraphs += 1
+            total_chars += len(text)
+            yield text
+        
+        for table in doc_tables:
+            for row in table.rows:
+                row_text = " | ".join(cell.text.strip() for cell in row.cells)
+                if not row_text.strip():
+                    continue
+                
+                separator = "\n" if num_rows else "\n\n=== Tables ===\n\n"
+                num_rows += 1
+                total_chars += len(separator) + len(row_text)
+                yield separator
+                yield row_text
+        
+        if not (num_paragraphs or num_rows):
+            raise ValueError("No text content extracted from DOCX")
+        
+        logger.info(
+            "Successfully extracted %s characters from %s paragraphs and %s tables",
+            total_chars,
+            num_paragraphs,
+            len(doc_tables)
+        )
+    
+    @staticmethod
+    def _read_metadata(doc: Any, doc_paragraphs: List[Any], doc_tables: List[Any]) -> Dict[str, Any]:
+        """
+        Read counts and core properties from an open DOCX
+        
+        Args:
+            doc: Open python-docx document
+            doc_paragraphs: Document paragraphs
+            doc_tables: Document tables
             
-            return {
-                "text": full_text,
-                "metadata": metadata,
-                "paragraphs": paragraphs,
-                "tables": table_texts
+        Returns:
+            Metadata dictionary
+        """
+        # Extract metadata from core properties
+        metadata = {
+            "num_paragraphs": len(doc_paragraphs),
+            "num_tables": len(doc_tables),
+            "docx_metadata": {}
+        }
+        
+        # Get document properties if available
+        if doc.core_properties:
+            props = doc.core_properties
+            metadata["docx_metadata"] = {
+                "title": props.title or "",
+                "author": props.author or "",
+                "subject": props.subject or "",
+                "created": str(props.created) if props.created else "",
+                "modified": str(props.modified) if props.modified else "",
             }
+        
+        return metadata
+    
+    def validate_header(self, header: bytes) -> bool:
+        """
+        Cheap validity check on the leading bytes of a file
+        
+        Args:
+            header: First bytes of the file (at least 1 KB when available)
             
-        except Exception as e:
-            logger.error(f"Failed to process DOCX {file_path}: {str(e)}")
-            raise
+        Returns:
+            True if the file starts like a DOCX
+        """
+        # DOCX files are ZIP archives
+        return header[:4] == b"PK\x03\x04"
     
     def validate_file(self, file_path: str) -> bool:
         """
@@ -119,5 +187,5 @@ class DOCXProcessor:
             _ = doc.paragraphs
             return True
         except Exception as e:
-            logger.error(f"Invalid DOCX file {file_path}: {str(e)}")
+            logger.error("Invalid DOCX file %s: %s", file_path, e)
             return False
\ No newline at end of file
@@ -1,13 +1,18 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any
-from pypdf import PdfReader
+from typing import BinaryIO, Dict, Any, Iterator, List, Optional, Tuple, Union
+import pypdfium2 as pdfium
 
-import sys
-sys.path.append('/app/shared')
-from logger import get_logger
+from shared.config import settings
+from shared.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Pages handed to a pool worker per task when extracting in parallel
+_PAGES_PER_TASK = 16
+
 
 class PDFProcessor:
     """
@@ -40,57 +45,195 @@ class PDFProcessor:
         Returns:
             Dictionary containing extracted text and metadata
         """
+        result = self.extract_text_stream(file_path, file_path)
+        return {
+            "text": "".join(result["text_iter"]),
+            "metadata": result["metadata"]
+        }
+    
+    def extract_text_stream(self, source: Union[str, BinaryIO], name: str = "<buffer>") -> Dict[str, Any]:
+        """
+        Extract text from a PDF lazily, one page at a time
+        
+        Args:
+            source: Path to PDF file, or the file opened in binary mode
+                (it must stay open until the text iterator is exhausted)
+            name: File name used in log messages
+            
+        Returns:
+            Dictionary containing metadata and "text_iter", an iterator of
+            text pieces that join to the same text extract_text returns
+        """
         try:
-            logger.info(f"Processing PDF: {file_path}")
+            logger.info("Processing PDF: %s", name)
             
-            reader = PdfReader(file_path)
+            pdf = pdfium.PdfDocument(source)
+            try:
+                metadata = self._read_metadata(pdf)
+            except Exception:
+                pdf.close()
+                raise
             
-            # Extract metadata
-            metadata = {
-                "num_pages": len(reader.pages),
-                "pdf_metadata": {}
-            }
+        except Exception as e:
+            logger.error("Failed to process PDF %s: %s", name, e)
+            raise
+        
+        return {
+            "metadata": metadata,
+            "text_iter": self._iter_pages(pdf, self._source_path(source))
+        }
+    
+    def _iter_pages(self, pdf: pdfium.PdfDocument, file_path: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield page texts separated by blank lines, closing the document at the end
+        
+        Args:
+            pdf: Open PDFium document
+            file_path: Path to the PDF, enables parallel extraction
             
-            # Get PDF metadata if available
-            if reader.metadata:
-                metadata["pdf_metadata"] = {
-                    "title": reader.metadata.get("/Title", ""),
-                    "author": reader.metadata.get("/Author", ""),
-                    "subject": reader.metadata.get("/Subject", ""),
-                    "creator": reader.metadata.get("/Creator", ""),
-                }
+        Yields:
+            Page texts and the separators between them
+        """
+        num_pages = 0
+        total_chars = 0
+        try:
+            for _, page_text in self._page_texts(pdf, file_path):
+                if not page_text.strip():
+                    continue
+                
+                if num_pages:
+                    yield "\n\n"
+                    total_chars += 2
+                num_pages += 1
+                total_chars += len(page_text)
+                yield page_text
+        finally:
+            pdf.close()
+        
+        if not num_pages:
+            raise ValueError("No text content extracted from PDF")
+        
+        logger.info("Successfully extracted %s characters from %s pages", total_chars, num_pages)
+    
+    def _page_texts(self, pdf: pdfium.PdfDocument, file_path: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page number, text) for every page that could be extracted, in order
+        PDFium is not thread-safe, so large PDFs are split into page ranges
+        extracted by worker processes that each reopen the file; small ones,
+        or documents without a path, are walked sequentially
+        
+        Args:
+            pdf: Open PDFium document
+            file_path: Path to the PDF, required for parallel extraction
             
-            # Extract text from all pages
-            text_content = []
-            for page_num, page in enumerate(reader.pages, start=1):
+        Yields:
+            Page number (1-based) and page text
+        """
+        num_pages = len(pdf)
+        max_workers = min(settings.PDF_EXTRACT_WORKERS, -(-num_pages // _PAGES_PER_TASK))
+        
+        if file_path is None or num_pages < settings.PDF_PARALLEL_MIN_PAGES or max_workers < 2:
+            for index in range(num_pages):
                 try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append({
-                            "page": page_num,
-                            "text": page_text
-                        })
+                    yield index + 1, self._extract_page_text(pdf, index)
                 except Exception as e:
-                    logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
-                    continue
-            
-            # Combine all text
-            full_text = "\n\n".join([page["text"] for page in text_content])
-            
-            if not full_text.strip():
-                raise ValueError("No text content extracted from PDF")
+                    logger.warning("Failed to extract text from page %s: %s", index + 1, e)
+            return
+        
+        logger.info("Extracting %s pages with %s processes", num_pages, max_workers)
+        starts = iter(range(0, num_pages, _PAGES_PER_TASK))
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        pending = deque()
+        try:
+            # Keep a bounded window of ranges in flight so extracted text
+            # never runs far ahead of the consumer
+            for start in islice(starts, 2 * max_workers):
+                pending.append(executor.submit(
+                    _extract_page_range, file_path, start, min(start + _PAGES_PER_TASK, num_pages)
+                ))
             
-            logger.info(f"Successfully extracted {len(full_text)} characters from {len(text_content)} pages")
+            while pending:
+                page_texts = pending.popleft().result()
+                for start in islice(starts, 1):
+                    pending.append(executor.submit(
+                        _extract_page_range, file_path, start, min(start + _PAGES_PER_TASK, num_pages)
+                    ))
+                yield from page_texts
+        finally:
+            # On early close, drop queued ranges instead of extracting them
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def _source_path(source: Union[str, BinaryIO]) -> Optional[str]:
+        """
+        Get the path pool workers can reopen, if the source has one
+        (files returned by open() carry it as their name)
+        """
+        path = source if isinstance(source, str) else getattr(source, "name", None)
+        return path if isinstance(path, str) else None
+    
+    @staticmethod
+    def _read_metadata(pdf: pdfium.PdfDocument) -> Dict[str, Any]:
+        """
+        Read page count and document info from an open PDF
+        
+        Args:
+            pdf: Open PDFium document
             
-            return {
-                "text": full_text,
-                "metadata": metadata,
-                "page_contents": text_content
+        Returns:
+            Metadata dictionary
+        """
+        metadata = {
+            "num_pages": len(pdf),
+            "pdf_metadata": {}
+        }
+        
+        # Get PDF metadata if available
+        pdf_info = pdf.get_metadata_dict(skip_empty=True)
+        if pdf_info:
+            metadata["pdf_metadata"] = {
+                "title": pdf_info.get("Title", ""),
+                "author": pdf_info.get("Author", ""),
+                "subject": pdf_info.get("Subject", ""),
+                "creator": pdf_info.get("Creator", ""),
             }
+        
+        return metadata
+    
+    @staticmethod
+    def _extract_page_text(pdf: pdfium.PdfDocument, index: int) -> str:
+        """
+        Extract the text of a single page
+        
+        Args:
+            pdf: Open PDFium document
+            index: Zero-based page index
             
-        except Exception as e:
-            logger.error(f"Failed to process PDF {file_path}: {str(e)}")
-            raise
+        Returns:
+            Page text
+        """
+        page = pdf[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range()
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+    
+    def validate_header(self, header: bytes) -> bool:
+        """
+        Cheap validity check on the leading bytes of a file
+        
+        Args:
+            header: First bytes of the file (at least 1 KB when available)
+            
+        Returns:
+            True if the file starts like a PDF
+        """
+        # The %PDF- marker may follow up to 1 KB of leading junk
+        return header.find(b"%PDF-", 0, 1024) != -1
     
     def validate_file(self, file_path: str) -> bool:
         """
@@ -103,11 +246,39 @@ class PDFProcessor:
             True if file is valid
         """
         try:
-            reader = PdfReader(file_path)
-            # Try to access first page
-            if len(reader.pages) > 0:
-                _ = reader.pages[0]
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                # Try to access first page
+                if len(pdf) > 0:
+                    pdf[0].close()
+            finally:
+                pdf.close()
             return True
         except Exception as e:
-            logger.error(f"Invalid PDF file {file_path}: {str(e)}")
-            return False
\ No newline at end of file
+            logger.error("Invalid PDF file %s: %s", file_path, e)
+            return False
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extract a range of pages inside a pool worker process
+    
+    Args:
+        file_path: Path to PDF file
+        start: First zero-based page index
+        stop: Zero-based page index to stop before
+        
+    Returns:
+        List of (page number, text) for pages that could be extracted
+    """
+    page_texts = []
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for index in range(start, stop):
+            try:
+                page_texts.append((index + 1, PDFProcessor._extract_page_text(pdf, index)))
+            except Exception as e:
+                logger.warning("Failed to extract text from page %s: %s", index + 1, e)
+    finally:
+        pdf.close()
+    return page_texts
\ No newline at end of file
@@ -1,18 +1,45 @@
-from typing import List, Dict, Any
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import Iterable, Iterator, List, Dict, Any, Sequence, Tuple
 
-import sys
-sys.path.append('/app/shared')
-from config import settings
-from logger import get_logger
+import numpy as np
+
+from shared.config import settings
+from shared.logger import get_logger
+
+from .chunk_walk import chunk_spans
 
 logger = get_logger(__name__)
 
+# Split boundaries in priority order:
+# paragraphs -> lines -> sentences -> clauses -> words
+SEPARATORS = [
+    "\n\n",  # Paragraph breaks
+    "\n",    # Line breaks
+    ". ",    # Sentence endings
+    "! ",    # Exclamation sentences
+    "? ",    # Question sentences
+    "; ",    # Semicolons
+    ", ",    # Commas
+    " ",     # Spaces
+]
+_SEPARATOR_RANK = {separator: rank for rank, separator in enumerate(SEPARATORS)}
+
+# One alternation over all separators, so a single regex pass finds every
+# candidate boundary (longer separators first so "\n\n" wins over "\n")
+_SEPARATOR_RE = re.compile("|".join(re.escape(separator) for separator in SEPARATORS))
+
+# Longest separator, i.e. how far a separator match can reach back
+_MAX_SEPARATOR_LEN = max(len(separator) for separator in SEPARATORS)
+
 
 class SemanticChunker:
     """
-    Semantic text chunker using LangChain
+    Semantic text chunker
     Splits text into meaningful chunks preserving semantic coherence
     """
     
@@ -31,30 +58,44 @@ class SemanticChunker:
         self.chunk_size = chunk_size or settings.CHUNK_SIZE
         self.chunk_overlap = chunk_overlap or settings.CHUNK_OVERLAP
         
-        # RecursiveCharacterTextSplitter tries to split on semantic boundaries
-        # Priority: \n\n (paragraphs) -> \n (lines) -> . (sentences) -> space -> character
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=[
-                "\n\n",  # Paragraph breaks
-                "\n",    # Line breaks
-                ". ",    # Sentence endings
-                "! ",    # Exclamation sentences
-                "? ",    # Question sentences
-                "; ",    # Semicolons
-                ", ",    # Commas
-                " ",     # Spaces
-                ""       # Characters
-            ],
-            keep_separator=True,
-            is_separator_regex=False
+        logger.info(
+            "SemanticChunker initialized with chunk_size=%s, overlap=%s",
+            self.chunk_size,
+            self.chunk_overlap
         )
+    
+    def _split_spans(self, text: str, start: int = 0, end: int = 0) -> List[Tuple[int, int]]:
+        """
+        Compute chunk boundaries from a single pass over separator offsets
+        Each chunk ends at the highest-priority separator past the previous
+        chunk's end that keeps it within chunk_size (the furthest one on ties),
+        or is cut at chunk_size when no separator fits. The next chunk starts
+        at the first separator inside the overlap window. The walk itself runs
+        in chunk_walk (compiled with Cython when available).
         
-        logger.info(
-            f"SemanticChunker initialized with chunk_size={self.chunk_size}, "
-            f"overlap={self.chunk_overlap}"
+        Args:
+            text: Text to split
+            start: Offset where splitting starts
+            end: End offset of the chunk before start (to resume a split)
+            
+        Returns:
+            List of (start, end) offsets into text
+        """
+        ends = array("q")
+        ranks = array("b")
+        for match in _SEPARATOR_RE.finditer(text):
+            ends.append(match.end())
+            ranks.append(_SEPARATOR_RANK[match.group()])
+        
+        return chunk_spans(
+            ends,
+            ranks,
+            len(text),
+            self.chunk_size,
+            self.chunk_overlap,
+            len(SEPARATORS),
+            start,
+            end
         )
     
     def chunk_text(
@@ -76,39 +117,129 @@ class SemanticChunker:
             if not text or not text.strip():
                 raise ValueError("Cannot chunk empty text")
             
-            logger.info(f"Chunking text of length {len(text)}")
-            
-            # Create LangChain Document
-            doc = Document(
-                page_content=text,
-                metadata=metadata or {}
-            )
+            logger.info("Chunking text of length %s", len(text))
             
             # Split into chunks
-            chunks = self.text_splitter.split_documents([doc])
-            
-            # Convert to our format
             chunk_list = []
-            for idx, chunk in enumerate(chunks):
-                chunk_dict = {
-                    "chunk_index": idx,
-                    "chunk_text": chunk.page_content,
-                    "chunk_size": len(chunk.page_content),
-                    "metadata": chunk.metadata
-                }
-                chunk_list.append(chunk_dict)
+            total_chars = 0
+            for start, end in self._split_spans(text):
+                chunk_content = text[start:end].strip()
+                if not chunk_content:
+                    continue
+                
+                chunk_list.append(self._make_chunk(len(chunk_list), chunk_content, metadata))
+                total_chars += len(chunk_content)
             
             logger.info(
-                f"Created {len(chunk_list)} chunks "
-                f"(avg size: {sum(c['chunk_size'] for c in chunk_list) / len(chunk_list):.0f} chars)"
+                "Created %s chunks (avg size: %.0f chars)",
+                len(chunk_list),
+                total_chars / len(chunk_list)
             )
             
             return chunk_list
             
         except Exception as e:
-            logger.error(f"Failed to chunk text: {str(e)}")
+            logger.error("Failed to chunk text: %s", e)
             raise
     
+    def iter_chunks(
+        self,
+        text_iter: Iterable[str],
+        metadata: Dict[str, Any] = None,
+        window_size: int = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Split streamed text into semantic chunks as it arrives
+        Produces the same chunks as chunk_text on the concatenated pieces
+        while holding only about window_size characters in memory. A chunk
+        is emitted once the text past its size limit is buffered, so later
+        pieces can no longer change its boundaries.
+        
+        Args:
+            text_iter: Iterable of text pieces
+            metadata: Optional metadata to attach to chunks
+            window_size: Characters buffered before splitting (default 16 chunks)
+            
+        Yields:
+            Chunk dictionaries
+        """
+        window_size = max(window_size or self.chunk_size * 16, self.chunk_size * 2)
+        
+        pieces = []
+        buffered = 0
+        # Walk state carried between windows: where the next chunk starts
+        # and where the previous one ended, relative to the window
+        start = 0
+        end = 0
+        window = ""
+        chunk_index = 0
+        total_chars = 0
+        
+        for piece in text_iter:
+            pieces.append(piece)
+            buffered += len(piece)
+            if buffered < window_size:
+                continue
+            
+            window = window + "".join(pieces)
+            pieces.clear()
+            buffered = 0
+            
+            # The last span always reaches the end of the window, so the
+            # loop stops at a resume point
+            resume = start
+            for span_start, span_end in self._split_spans(window, start, end):
+                # Spans whose size limit reaches the end of the window are not
+                # final yet; the walk resumes from the first one
+                if span_start + self.chunk_size >= len(window):
+                    resume = span_start
+                    break
+                start, end = span_start, span_end
+                
+                chunk_content = window[span_start:span_end].strip()
+                if chunk_content:
+                    yield self._make_chunk(chunk_index, chunk_content, metadata)
+                    chunk_index += 1
+                    total_chars += len(chunk_content)
+            
+            # Keep the text the resumed walk can look at: the overlap window
+            # before the resume point, plus a separator's reach before that
+            keep_from = max(resume - self.chunk_overlap - _MAX_SEPARATOR_LEN, 0)
+            window = window[keep_from:]
+            start = resume - keep_from
+            end = max(end - keep_from, 0)
+        
+        # Split whatever is left with the real end of text in view
+        window = window + "".join(pieces)
+        if start < len(window):
+            for span_start, span_end in self._split_spans(window, start, end):
+                chunk_content = window[span_start:span_end].strip()
+                if chunk_content:
+                    yield self._make_chunk(chunk_index, chunk_content, metadata)
+                    chunk_index += 1
+                    total_chars += len(chunk_content)
+        
+        if not chunk_index:
+            raise ValueError("Cannot chunk empty text")
+        
+        logger.info(
+            "Created %s chunks (avg size: %.0f chars)",
+            chunk_index,
+            total_chars / chunk_index
+        )
+    
+    @staticmethod
+    def _make_chunk(chunk_index: int, chunk_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a chunk dictionary
+        """
+        return {
+            "chunk_index": chunk_index,
+            "chunk_text": chunk_content,
+            "chunk_size": len(chunk_content),
+            "metadata": dict(metadata or {})
+        }
+    
     def chunk_documents(
         self,
         texts: List[str],
@@ -130,12 +261,20 @@ class SemanticChunker:
         if len(texts) != len(metadatas):
             raise ValueError("Number of texts and metadatas must match")
         
-        all_chunks = []
-        for text, metadata in zip(texts, metadatas):
-            chunks = self.chunk_text(text, metadata)
-            all_chunks.append(chunks)
+        # Single document: not worth the process pool startup cost
+        if len(texts) <= 1:
+            return [self.chunk_text(text, metadata) for text, metadata in zip(texts, metadatas)]
         
-        return all_chunks
+        # Chunking is CPU-bound, so spread documents across processes
+        with ProcessPoolExecutor(max_workers=min(len(texts), os.cpu_count() or 1)) as executor:
+            return list(executor.map(
+                _chunk_one,
+                texts,
+                metadatas,
+                repeat(self.chunk_size),
+                repeat(self.chunk_overlap),
+                chunksize=4
+            ))
     
     def get_chunk_stats(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -147,7 +286,19 @@ class SemanticChunker:
         Returns:
             Statistics dictionary
         """
-        if not chunks:
+        return self.get_size_stats([c["chunk_size"] for c in chunks])
+    
+    def get_size_stats(self, chunk_sizes: Sequence[int]) -> Dict[str, Any]:
+        """
+        Get statistics from chunk sizes alone, for chunks that were not kept
+        
+        Args:
+            chunk_sizes: Size of each chunk in characters
+            
+        Returns:
+            Statistics dictionary
+        """
+        if not chunk_sizes:
             return {
                 "num_chunks": 0,
                 "total_chars": 0,
@@ -156,12 +307,41 @@ class SemanticChunker:
                 "max_chunk_size": 0
             }
         
-        sizes = [c["chunk_size"] for c in chunks]
+        sizes = np.asarray(chunk_sizes, dtype=np.int64)
         
         return {
-            "num_chunks": len(chunks),
-            "total_chars": sum(sizes),
-            "avg_chunk_size": sum(sizes) / len(sizes),
-            "min_chunk_size": min(sizes),
-            "max_chunk_size": max(sizes)
-        }
\ No newline at end of file
+            "num_chunks": int(sizes.size),
+            "total_chars": int(sizes.sum()),
+            "avg_chunk_size": float(sizes.mean()),
+            "min_chunk_size": int(sizes.min()),
+            "max_chunk_size": int(sizes.max())
+        }
+
+
+@lru_cache(maxsize=None)
+def _get_worker_chunker(chunk_size: int, chunk_overlap: int) -> SemanticChunker:
+    """
+    Get a chunker for a pool worker process, built once per settings pair
+    """
+    return SemanticChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def _chunk_one(
+    text: str,
+    metadata: Dict[str, Any],
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[Dict[str, Any]]:
+    """
+    Chunk a single document inside a pool worker process
+    
+    Args:
+        text: Text to chunk
+        metadata: Metadata to attach to chunks
+        chunk_size: Maximum chunk size in characters
+        chunk_overlap: Overlap between chunks
+        
+    Returns:
+        List of chunk dictionaries
+    """
+    return _get_worker_chunker(chunk_size, chunk_overlap).chunk_text(text, metadata)
\ No newline at end of file
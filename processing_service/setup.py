@@ -0,0 +1,17 @@
+"""
+Build the optional compiled chunking extension in place:
+
+    python setup.py build_ext --inplace
+
+Without it, processors/chunk_walk.py is used as a pure-Python fallback
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="processing_service",
+    ext_modules=cythonize(
+        "processors/chunk_walk.pyx",
+        compiler_directives={"language_level": "3"},
+    ),
+)
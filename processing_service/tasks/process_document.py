@@ -1,18 +1,77 @@
-import uuid
-from typing import Dict, Any
+import logging
+import os
+import orjson
+from typing import Dict, Any, List
 from pathlib import Path
 
-import sys
-sys.path.append('/app/shared')
-from config import settings
-from logger import get_logger
-from database import update_document_status, create_chunk_records
-from redis_queue import enqueue_embedding_job
+from shared.config import settings
+from shared.logger import get_logger
+from shared.database import update_document_status, create_chunk_records
+from shared.redis_queue import (
+    enqueue_embedding_job,
+    open_embedding_batches,
+    add_embedding_batch,
+    finish_embedding_batch,
+    cancel_embedding_jobs,
+    enqueue_vector_cleanup_job
+)
 
 from processors import PDFProcessor, DOCXProcessor, SemanticChunker
 
 logger = get_logger(__name__)
 
+# Processors are stateless, so one instance per file type serves every job
+_PROCESSORS = {
+    "pdf": PDFProcessor(),
+    "docx": DOCXProcessor(),
+}
+
+# The chunker holds only its settings, so it is shared across jobs too
+_CHUNKER = SemanticChunker()
+
+
+def _save_and_queue_batch(document_id: str, batch: List[Dict[str, Any]]) -> str:
+    """
+    Assign chunk IDs, save a batch of chunk records and queue it for embedding
+    
+    Args:
+        document_id: Document ID
+        batch: Chunk records without chunk_id
+        
+    Returns:
+        Embedding job ID
+    """
+    # One random draw for the whole batch: 6 bytes -> 12 hex chars per ID
+    raw = os.urandom(6 * len(batch)).hex()
+    for i, record in enumerate(batch):
+        record["chunk_id"] = f"chunk_{raw[i * 12:(i + 1) * 12]}"
+    
+    create_chunk_records(batch)
+    
+    add_embedding_batch(document_id)
+    return enqueue_embedding_job({
+        "document_id": document_id,
+        "chunks": batch
+    })
+
+
+def _discard_embedding_jobs(document_id: str, job_ids: List[str]):
+    """
+    Stop a failed document's queued batches from reaching Weaviate
+    Queued jobs are removed and a cleanup job deletes whatever the
+    already-started ones store; failures here are only logged so the
+    original error is the one raised
+    
+    Args:
+        document_id: Document ID (already marked failed)
+        job_ids: Embedding job IDs queued for the document
+    """
+    try:
+        cancel_embedding_jobs(job_ids)
+        enqueue_vector_cleanup_job(document_id)
+    except Exception as e:
+        logger.error("Failed to discard embedding jobs for %s: %s", document_id, e)
+
 
 def process_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -33,91 +92,91 @@ def process_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
     file_path = job_data.get("file_path")
     file_type = job_data.get("file_type")
     
-    logger.info(f"Starting document processing: {document_id}")
+    logger.info("Starting document processing: %s", document_id)
     
+    job_ids = []
     try:
         # Update status to processing
         update_document_status(document_id, "processing")
         
         # Step 1: Select appropriate processor
-        if file_type == "pdf":
-            processor = PDFProcessor()
-        elif file_type == "docx":
-            processor = DOCXProcessor()
-        else:
+        try:
+            processor = _PROCESSORS[file_type]
+        except KeyError:
             raise ValueError(f"Unsupported file type: {file_type}")
         
-        # Step 2: Validate file
-        if not Path(file_path).exists():
+        # Step 2: Validate file from its header, keeping the handle open for extraction
+        if not Path(file_path).is_file():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        if not processor.validate_file(file_path):
-            raise ValueError(f"Invalid or corrupted file: {file_path}")
-        
-        # Step 3: Extract text
-        logger.info(f"Extracting text from {file_type}: {file_path}")
-        extraction_result = processor.extract_text(file_path)
-        
-        text = extraction_result["text"]
-        doc_metadata = extraction_result["metadata"]
-        
-        logger.info(f"Extracted {len(text)} characters from document")
-        
-        # Step 4: Chunk text using semantic chunker
-        logger.info("Starting semantic chunking...")
-        chunker = SemanticChunker()
-        
-        chunk_metadata = {
-            "document_id": document_id,
-            "file_type": file_type,
-            **doc_metadata
-        }
-        
-        chunks = chunker.chunk_text(text, metadata=chunk_metadata)
-        
-        # Get chunk statistics
-        stats = chunker.get_chunk_stats(chunks)
-        logger.info(f"Chunking complete: {stats}")
-        
-        # Step 5: Prepare chunks for database and embedding
-        chunk_records = []
-        for chunk in chunks:
-            chunk_id = f"chunk_{uuid.uuid4().hex[:12]}"
+        with open(file_path, "rb") as file:
+            if not processor.validate_header(file.read(1024)):
+                raise ValueError(f"Invalid or corrupted file: {file_path}")
+            file.seek(0)
+            
+            # Step 3: Extract text as a stream of pages/paragraphs
+            logger.info("Extracting text from %s: %s", file_type, file_path)
+            extraction_result = processor.extract_text_stream(file, file_path)
+            
+            # Step 4: Chunk text using semantic chunker as it is extracted
+            logger.info("Starting semantic chunking...")
+            chunker = _CHUNKER
             
-            chunk_record = {
-                "chunk_id": chunk_id,
+            chunk_metadata = {
                 "document_id": document_id,
-                "chunk_index": chunk["chunk_index"],
-                "chunk_text": chunk["chunk_text"],
-                "chunk_size": chunk["chunk_size"],
-                "metadata": str(chunk.get("metadata", {}))  # Convert to string for SQLite
+                "file_type": file_type,
+                **extraction_result["metadata"]
             }
-            chunk_records.append(chunk_record)
-        
-        # Step 6: Save chunks to database
-        logger.info(f"Saving {len(chunk_records)} chunks to database...")
-        create_chunk_records(chunk_records)
-        
-        # Step 7: Queue embedding job
-        logger.info("Queueing embedding job...")
-        embedding_job_data = {
-            "document_id": document_id,
-            "chunks": chunk_records
-        }
-        
-        job_id = enqueue_embedding_job(embedding_job_data)
-        logger.info(f"Embedding job queued: {job_id}")
+            
+            # Step 5 & 6: Save chunks and queue embedding in batches as chunks
+            # are produced, so neither the full text nor the full chunk list
+            # is held in memory and embedding starts while later pages are
+            # still being extracted
+            batch_size = settings.CHUNK_BATCH_SIZE
+            logger.info("Saving and queueing chunks in batches of %s...", batch_size)
+            
+            open_embedding_batches(document_id)
+            chunk_sizes = []
+            batch = []
+            for chunk in chunker.iter_chunks(extraction_result["text_iter"], chunk_metadata):
+                batch.append({
+                    "document_id": document_id,
+                    "chunk_index": chunk["chunk_index"],
+                    "chunk_text": chunk["chunk_text"],
+                    "chunk_size": chunk["chunk_size"],
+                    "metadata": orjson.dumps(chunk.get("metadata", {})).decode()  # JSON string for SQLite
+                })
+                chunk_sizes.append(chunk["chunk_size"])
+                
+                if len(batch) >= batch_size:
+                    job_ids.append(_save_and_queue_batch(document_id, batch))
+                    batch = []
+            
+            if batch:
+                job_ids.append(_save_and_queue_batch(document_id, batch))
         
-        # Step 8: Return result
+        # Get chunk statistics
+        stats = chunker.get_size_stats(chunk_sizes)
+        logger.info("Chunking complete: %s", stats)
+        logger.info("Embedding jobs queued: %s", len(job_ids))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Embedding job IDs: %s", ", ".join(job_ids))
+        
+        # Release the processing token; if every batch is already embedded
+        # the document is complete now
+        if finish_embedding_batch(document_id):
+            update_document_status(document_id, "completed")
+        
+        # Step 7: Return result
         result = {
             "document_id": document_id,
             "status": "processed",
-            "num_chunks": len(chunk_records),
+            "num_chunks": len(chunk_sizes),
             "stats": stats,
-            "embedding_job_id": job_id
+            "embedding_job_ids": job_ids
         }
         
-        logger.info(f"Document processing complete: {document_id}")
+        logger.info("Document processing complete: %s", document_id)
         return result
         
     except Exception as e:
@@ -125,4 +184,8 @@ def process_document_task(job_data: Dict[str, Any]) -> Dict[str, Any]:
         error_message = f"Processing failed: {str(e)}"
         logger.error(error_message, exc_info=True)
         update_document_status(document_id, "failed", error_message)
+        
+        # Batches queued before the failure must not store vectors for it
+        if job_ids:
+            _discard_embedding_jobs(document_id, job_ids)
         raise
\ No newline at end of file
@@ -3,51 +3,60 @@
 Processing Service Worker
 Consumes jobs from Redis queue and processes documents
 """
+import os
 import sys
-sys.path.append('/app/shared')
 
-from rq import Worker, Queue
+from rq import Queue
+from rq.worker_pool import WorkerPool
 from redis import Redis
 
-from config import settings, get_redis_url
-from logger import get_logger
+from shared.config import settings, get_redis_url
+from shared.logger import get_logger
+from shared.redis_queue import get_redis_connection_pool
+
+# Import the task module up front so the processors and chunker it builds
+# are inherited by every forked worker and job instead of rebuilt per job
+import tasks.process_document  # noqa: F401
 
 logger = get_logger(__name__)
 
 
 def main():
     """
-    Start RQ worker for processing queue
+    Start RQ worker pool for processing queue
     """
     try:
+        num_workers = settings.PROCESS_WORKER_CONCURRENCY or os.cpu_count() or 1
+        
         logger.info("Starting Processing Worker...")
-        logger.info(f"Queue: {settings.QUEUE_PROCESSING}")
-        logger.info(f"Redis URL: {get_redis_url()}")
+        logger.info("Queue: %s", settings.QUEUE_PROCESSING)
+        logger.info("Redis URL: %s", get_redis_url())
+        logger.info("Worker processes: %s", num_workers)
         
-        # Connect to Redis
-        redis_conn = Redis.from_url(get_redis_url())
+        # Connect to Redis through the shared pool; RQ needs raw responses
+        redis_conn = Redis(connection_pool=get_redis_connection_pool(decode_responses=False))
         
         # Create queue
         queue = Queue(settings.QUEUE_PROCESSING, connection=redis_conn)
         
-        logger.info(f"Connected to Redis. Queue size: {len(queue)}")
+        logger.info("Connected to Redis. Queue size: %s", len(queue))
         
-        # Create worker
-        worker = Worker(
+        # Create worker pool; documents are parsed and chunked in parallel
+        worker_pool = WorkerPool(
             [queue],
             connection=redis_conn,
-            name=f"processing-worker-{settings.ENVIRONMENT}"
+            num_workers=num_workers
         )
         
-        logger.info("Worker ready. Waiting for jobs...")
+        logger.info("Worker pool ready. Waiting for jobs...")
         
-        # Start worker (blocking call)
-        worker.work(with_scheduler=True)
+        # Start worker pool (blocking call)
+        worker_pool.start()
         
     except KeyboardInterrupt:
         logger.info("Worker interrupted by user")
     except Exception as e:
-        logger.error(f"Worker error: {str(e)}", exc_info=True)
+        logger.error("Worker error: %s", e, exc_info=True)
         sys.exit(1)
 
 
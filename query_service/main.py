@@ -1,11 +1,11 @@
+import httpx
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-import sys
-sys.path.append('/app/shared')
-from logger import get_logger
-from config import settings
+from shared.logger import get_logger
+from shared.config import settings
 
 from routes import query, health
 
@@ -19,13 +19,31 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting Query Service...")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Ollama Model: {settings.OLLAMA_MODEL}")
+    logger.info("Environment: %s", settings.ENVIRONMENT)
+    logger.info("Ollama Model: %s", settings.OLLAMA_MODEL)
+    
+    # Shared async HTTP client with pooled keep-alive connections
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=5,
+        limits=httpx.Limits(max_keepalive_connections=32)
+    )
+    
+    # Build embedder and vector store before serving the first query
+    try:
+        logger.info("Initializing embedder and vector store...")
+        await query.init_query_state(app.state)
+        logger.info("Embedder and vector store initialized successfully")
+    except Exception as e:
+        app.state.vector_store = None
+        logger.error("Failed to initialize vector store: %s", e)
+        # Don't fail startup; /query retries the initialization
     
     yield
     
     # Shutdown
     logger.info("Shutting down Query Service...")
+    await app.state.http.aclose()
 
 
 # Create FastAPI app
@@ -33,7 +51,8 @@ app = FastAPI(
     title="Document Query Service",
     description="Microservice for semantic search and document retrieval",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -69,11 +88,14 @@ async def root():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
-        port=8001,
-        reload=True,
+        port=settings.API_QUERY_PORT,
+        workers=settings.API_QUERY_WORKERS or min(os.cpu_count() or 1, 4),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file
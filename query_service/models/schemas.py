@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -10,15 +10,14 @@ class QueryRequest(BaseModel):
     document_id: Optional[str] = Field(None, description="Filter by specific document ID")
     file_type: Optional[str] = Field(None, description="Filter by file type (pdf, docx)")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "q": "What is the revenue in 2023?",
-                "top_k": 5,
-                "document_id": None,
-                "file_type": None
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "q": "What is the revenue in 2023?",
+            "top_k": 5,
+            "document_id": None,
+            "file_type": None
         }
+    })
 
 
 class ChunkResult(BaseModel):
@@ -30,20 +29,19 @@ class ChunkResult(BaseModel):
     score: Optional[float] = None
     metadata: Dict[str, Any] = {}
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "chunk_id": "chunk_abc123",
-                "document_id": "doc_xyz789",
-                "chunk_index": 0,
-                "text": "The revenue in 2023 was $10M...",
-                "score": 0.85,
-                "metadata": {
-                    "filename": "report.pdf",
-                    "file_type": "pdf"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "chunk_id": "chunk_abc123",
+            "document_id": "doc_xyz789",
+            "chunk_index": 0,
+            "text": "The revenue in 2023 was $10M...",
+            "score": 0.85,
+            "metadata": {
+                "filename": "report.pdf",
+                "file_type": "pdf"
             }
         }
+    })
 
 
 class QueryResponse(BaseModel):
@@ -53,24 +51,23 @@ class QueryResponse(BaseModel):
     results: List[ChunkResult]
     execution_time_ms: float
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "What is the revenue in 2023?",
-                "num_results": 3,
-                "results": [
-                    {
-                        "chunk_id": "chunk_abc123",
-                        "document_id": "doc_xyz789",
-                        "chunk_index": 0,
-                        "text": "The revenue in 2023 was $10M...",
-                        "score": 0.85,
-                        "metadata": {"filename": "report.pdf"}
-                    }
-                ],
-                "execution_time_ms": 125.5
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "What is the revenue in 2023?",
+            "num_results": 3,
+            "results": [
+                {
+                    "chunk_id": "chunk_abc123",
+                    "document_id": "doc_xyz789",
+                    "chunk_index": 0,
+                    "text": "The revenue in 2023 was $10M...",
+                    "score": 0.85,
+                    "metadata": {"filename": "report.pdf"}
+                }
+            ],
+            "execution_time_ms": 125.5
         }
+    })
 
 
 class DocumentInfo(BaseModel):
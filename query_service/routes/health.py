@@ -1,11 +1,11 @@
-from fastapi import APIRouter
+import asyncio
+
+from fastapi import APIRouter, Request
 from datetime import datetime
 
-import sys
-sys.path.append('/app/shared')
-from vector_store import get_weaviate_client
-from config import get_ollama_url
-from logger import get_logger
+from shared.vector_store import get_weaviate_client, check_weaviate_client
+from shared.config import get_ollama_url
+from shared.logger import get_logger
 
 from models.schemas import HealthResponse
 
@@ -14,29 +14,29 @@ logger = get_logger(__name__)
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """
     Health check endpoint
-    Checks connection to Weaviate and Ollama
+    Checks connection to Weaviate and Ollama without blocking the event loop
     """
     weaviate_connected = False
     ollama_connected = False
     
     # Check Weaviate
     try:
-        client = get_weaviate_client()
-        weaviate_connected = client.is_ready()
-        client.close()
+        # Shared process-wide client; only the first check pays the connect,
+        # and a client that is no longer ready is dropped so the next reconnects
+        client = await asyncio.to_thread(get_weaviate_client)
+        weaviate_connected = await asyncio.to_thread(check_weaviate_client, client)
     except Exception as e:
-        logger.warning(f"Weaviate health check failed: {str(e)}")
+        logger.warning("Weaviate health check failed: %s", e)
     
     # Check Ollama (basic connectivity check)
     try:
-        import requests
-        response = requests.get(f"{get_ollama_url()}/api/tags", timeout=5)
+        response = await request.app.state.http.get(f"{get_ollama_url()}/api/tags")
         ollama_connected = response.status_code == 200
     except Exception as e:
-        logger.warning(f"Ollama health check failed: {str(e)}")
+        logger.warning("Ollama health check failed: %s", e)
     
     return HealthResponse(
         status="healthy" if (weaviate_connected and ollama_connected) else "degraded",
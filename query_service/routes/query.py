@@ -1,18 +1,29 @@
+import asyncio
+import hashlib
+import threading
 import time
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any, Optional
+import orjson
+from collections import OrderedDict
+from functools import partial
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from typing import Callable, Dict, Any, Optional
 
-import sys
-sys.path.append('/app/shared')
-from config import settings
-from logger import get_logger
-from vector_store import get_vector_store, search_similar_documents
-from database import get_all_documents, get_document_chunks
+from shared.config import settings
+from shared.logger import get_logger
+from shared.vector_store import get_vector_store, search_similar_documents, check_weaviate_client
+from shared.database import (
+    get_all_documents,
+    count_documents,
+    get_document,
+    get_document_chunks,
+    get_chunk_counts,
+    get_data_version
+)
 
 from models.schemas import (
     QueryRequest,
     QueryResponse,
-    ChunkResult,
     DocumentListResponse,
     DocumentInfo
 )
@@ -26,12 +37,19 @@ logger = get_logger(__name__)
 # Global embedder instance (initialized on first use)
 _embedder = None
 
+# Document responses built at the current data_version; the cache is cleared
+# when the version moves on, so superseded responses are not kept around
+_RESPONSE_CACHE_SIZE = 32
+_response_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_response_cache_version = -1
+_response_cache_lock = threading.Lock()
+
 
 def get_embedder():
     """Get or create embedder instance"""
     global _embedder
     if _embedder is None:
-        from config import get_ollama_url
+        from shared.config import get_ollama_url
         logger.info("Initializing Ollama embedder for queries...")
         _embedder = OllamaEmbeddings(
             model=settings.OLLAMA_MODEL,
@@ -40,28 +58,41 @@ def get_embedder():
     return _embedder
 
 
-@router.post("/query", response_model=QueryResponse)
-async def query_documents(request: QueryRequest):
+async def init_query_state(app_state):
+    """
+    Build the embedder and vector store once and keep them on app state
+    
+    Args:
+        app_state: FastAPI application state
+    """
+    app_state.embedder = get_embedder()
+    app_state.vector_store = await asyncio.to_thread(get_vector_store, app_state.embedder)
+
+
+@router.post("/query", response_model=None, responses={200: {"model": QueryResponse}})
+async def query_documents(request: QueryRequest, http_request: Request):
     """
     Query documents using semantic search
     
     Args:
         request: Query request with search parameters
+        http_request: Incoming HTTP request (for app state)
     
     Returns:
         Query results with relevant chunks
     """
-    start_time = time.time()
+    start_time = time.monotonic_ns()
     
     try:
-        logger.info(f"Processing query: '{request.q}'")
-        logger.info(f"Parameters: top_k={request.top_k}, document_id={request.document_id}, file_type={request.file_type}")
-        
-        # Step 1: Get embedder
-        embedder = get_embedder()
+        logger.info("Processing query: %r", request.q)
+        logger.info("Parameters: top_k=%s, document_id=%s, file_type=%s", request.top_k, request.document_id, request.file_type)
         
-        # Step 2: Get vector store
-        vector_store = get_vector_store(embedder)
+        # Step 1-2: Get embedder and vector store built at startup
+        # (built here instead if startup could not reach Weaviate)
+        app_state = http_request.app.state
+        if getattr(app_state, "vector_store", None) is None:
+            await init_query_state(app_state)
+        vector_store = app_state.vector_store
         
         # Step 3: Build filter if needed
         filter_dict = None
@@ -74,7 +105,8 @@ async def query_documents(request: QueryRequest):
         
         # Step 4: Search
         logger.info("Executing semantic search...")
-        results = search_similar_documents(
+        results = await asyncio.to_thread(
+            search_similar_documents,
             vector_store=vector_store,
             query=request.q,
             k=request.top_k,
@@ -82,85 +114,201 @@ async def query_documents(request: QueryRequest):
         )
         
         # Step 5: Format results
-        chunk_results = []
-        for doc in results:
-            chunk_result = ChunkResult(
-                chunk_id=doc.metadata.get("chunk_id", ""),
-                document_id=doc.metadata.get("document_id", ""),
-                chunk_index=doc.metadata.get("chunk_index", 0),
-                text=doc.page_content,
-                score=doc.metadata.get("score"),  # If available
-                metadata={
-                    "filename": doc.metadata.get("filename", ""),
-                    "file_type": doc.metadata.get("file_type", ""),
-                    **{k: v for k, v in doc.metadata.items() 
-                       if k not in ["chunk_id", "document_id", "chunk_index", "filename", "file_type"]}
+        reserved_keys = {"chunk_id", "document_id", "chunk_index", "filename", "file_type"}
+        chunk_rows = [
+            {
+                "chunk_id": md.get("chunk_id", ""),
+                "document_id": md.get("document_id", ""),
+                "chunk_index": md.get("chunk_index", 0),
+                "text": doc.page_content,
+                "score": md.get("score"),  # If available
+                "metadata": {
+                    "filename": md.get("filename", ""),
+                    "file_type": md.get("file_type", ""),
+                    **{k: v for k, v in md.items() if k not in reserved_keys}
                 }
-            )
-            chunk_results.append(chunk_result)
+            }
+            for doc in results
+            for md in (doc.metadata,)
+        ]
         
-        execution_time = (time.time() - start_time) * 1000  # Convert to ms
+        execution_time = (time.monotonic_ns() - start_time) / 1_000_000  # Convert to ms
         
-        logger.info(f"Query completed: {len(chunk_results)} results in {execution_time:.2f}ms")
+        logger.info("Query completed: %s results in %.2fms", len(chunk_rows), execution_time)
         
-        return QueryResponse(
-            query=request.q,
-            num_results=len(chunk_results),
-            results=chunk_results,
-            execution_time_ms=round(execution_time, 2)
-        )
+        # Rows are built in the QueryResponse shape, so they are serialized
+        # directly with orjson; QueryResponse only documents the schema
+        return ORJSONResponse({
+            "query": request.q,
+            "num_results": len(chunk_rows),
+            "results": chunk_rows,
+            "execution_time_ms": round(execution_time, 2)
+        })
         
     except Exception as e:
-        logger.error(f"Query failed: {str(e)}", exc_info=True)
+        logger.error("Query failed: %s", e, exc_info=True)
+        
+        # Rebuild the vector store on the next query if its client is dead
+        vector_store = getattr(http_request.app.state, "vector_store", None)
+        if vector_store is not None:
+            if not await asyncio.to_thread(check_weaviate_client, vector_store._client):
+                http_request.app.state.vector_store = None
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Query execution failed: {str(e)}"
         )
 
 
+def _etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the parts that identify a response
+    """
+    key = ":".join(str(part) for part in parts)
+    return '"' + hashlib.blake2b(key.encode(), digest_size=8).hexdigest() + '"'
+
+
+def _not_modified(http_request: Request, etag: str) -> bool:
+    """
+    Check whether the client already holds the response for this ETag
+    """
+    if_none_match = http_request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def _cached_response(key: tuple, data_version: int, build: Callable[[], Any]) -> Any:
+    """
+    Get a response built at data_version, building and caching it on a miss
+    Called through asyncio.to_thread since building reads SQLite
+    """
+    global _response_cache_version
+    with _response_cache_lock:
+        if data_version > _response_cache_version:
+            _response_cache.clear()
+            _response_cache_version = data_version
+        elif data_version == _response_cache_version and key in _response_cache:
+            _response_cache.move_to_end(key)
+            return _response_cache[key]
+    
+    value = build()
+    
+    with _response_cache_lock:
+        # Skip storing if a newer version was seen while building
+        if data_version == _response_cache_version:
+            _response_cache[key] = value
+            if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+                _response_cache.popitem(last=False)
+    return value
+
+
+def _build_document_list(
+    status_filter: Optional[str],
+    limit: Optional[int],
+    offset: int
+) -> DocumentListResponse:
+    """
+    Build the document list from the database
+    """
+    # Get documents from database
+    documents = get_all_documents(status=status_filter, limit=limit, offset=offset)
+    chunk_counts = get_chunk_counts(status=status_filter)
+    
+    # Format response
+    doc_infos = []
+    for doc in documents:
+        doc_info = DocumentInfo(
+            document_id=doc["document_id"],
+            filename=doc["filename"],
+            file_type=doc["file_type"],
+            file_size=doc["file_size"],
+            status=doc["status"],
+            upload_time=doc["upload_time"],
+            num_chunks=chunk_counts.get(doc["document_id"], 0)
+        )
+        doc_infos.append(doc_info)
+    
+    # A page needs a separate count; an unpaged list is its own total
+    if limit is None and offset == 0:
+        total_documents = len(doc_infos)
+    else:
+        total_documents = count_documents(status=status_filter)
+    
+    return DocumentListResponse(
+        total_documents=total_documents,
+        documents=doc_infos
+    )
+
+
+def _build_document_details(document_id: str, include_text: bool) -> Optional[Dict[str, Any]]:
+    """
+    Build the document details from the database (None if not found)
+    """
+    # Get document
+    doc = get_document(document_id)
+    if not doc:
+        return None
+    
+    # Get chunks, decoding their JSON metadata
+    chunks = get_document_chunks(document_id, with_text=include_text)
+    for chunk in chunks:
+        if chunk.get("metadata"):
+            try:
+                chunk["metadata"] = orjson.loads(chunk["metadata"])
+            except orjson.JSONDecodeError:
+                pass  # Rows written before metadata was stored as JSON
+    
+    return {
+        "document": doc,
+        "num_chunks": len(chunks),
+        "chunks": chunks
+    }
+
+
 @router.get("/documents", response_model=DocumentListResponse)
-async def list_documents(status_filter: Optional[str] = None):
+async def list_documents(
+    http_request: Request,
+    response: Response,
+    status_filter: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of documents"),
+    offset: int = Query(0, ge=0, description="Number of documents to skip")
+):
     """
     List all documents
+    Cached in memory and tagged with an ETag until documents or chunks change
     
     Args:
+        http_request: Incoming HTTP request (for If-None-Match)
+        response: Outgoing response (for the ETag header)
         status_filter: Optional filter by status (uploaded, processing, completed, failed)
+        limit: Optional page size (newest documents first)
+        offset: Number of documents to skip
     
     Returns:
         List of documents with metadata
     """
     try:
-        logger.info(f"Listing documents (filter: {status_filter})")
-        
-        # Get documents from database
-        documents = get_all_documents(status=status_filter)
-        
-        # Format response
-        doc_infos = []
-        for doc in documents:
-            # Get chunk count
-            chunks = get_document_chunks(doc["document_id"])
-            
-            doc_info = DocumentInfo(
-                document_id=doc["document_id"],
-                filename=doc["filename"],
-                file_type=doc["file_type"],
-                file_size=doc["file_size"],
-                status=doc["status"],
-                upload_time=doc["upload_time"],
-                num_chunks=len(chunks)
-            )
-            doc_infos.append(doc_info)
+        logger.info("Listing documents (filter: %s)", status_filter)
         
-        logger.info(f"Found {len(doc_infos)} documents")
+        data_version = await asyncio.to_thread(get_data_version)
+        etag = _etag("documents", status_filter, limit, offset, data_version)
+        if _not_modified(http_request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
         
-        return DocumentListResponse(
-            total_documents=len(doc_infos),
-            documents=doc_infos
+        document_list = await asyncio.to_thread(
+            _cached_response,
+            ("documents", status_filter, limit, offset),
+            data_version,
+            partial(_build_document_list, status_filter, limit, offset)
         )
+        response.headers["ETag"] = etag
+        
+        logger.info("Found %s documents", document_list.total_documents)
+        
+        return document_list
         
     except Exception as e:
-        logger.error(f"Failed to list documents: {str(e)}", exc_info=True)
+        logger.error("Failed to list documents: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve documents: {str(e)}"
@@ -168,43 +316,59 @@ async def list_documents(status_filter: Optional[str] = None):
 
 
 @router.get("/documents/{document_id}")
-async def get_document_details(document_id: str):
+async def get_document_details(
+    document_id: str,
+    http_request: Request,
+    response: Response,
+    include_text: bool = Query(True, description="Include chunk text and metadata")
+):
     """
     Get details for a specific document including all chunks
+    Tagged with an ETag until documents or chunks change; responses without
+    chunk text are also cached in memory
     
     Args:
         document_id: Document ID
+        http_request: Incoming HTTP request (for If-None-Match)
+        response: Outgoing response (for the ETag header)
+        include_text: Include chunk text and metadata (False lists chunk sizes only)
     
     Returns:
         Document metadata and chunks
     """
     try:
-        from database import get_document
+        logger.info("Getting document details: %s", document_id)
         
-        logger.info(f"Getting document details: {document_id}")
+        data_version = await asyncio.to_thread(get_data_version)
+        etag = _etag("document", document_id, include_text, data_version)
+        if _not_modified(http_request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
         
-        # Get document
-        doc = get_document(document_id)
-        if not doc:
+        if include_text:
+            # Full chunk text is too large to keep in memory; the ETag still
+            # spares repeat transfers
+            details = await asyncio.to_thread(_build_document_details, document_id, True)
+        else:
+            details = await asyncio.to_thread(
+                _cached_response,
+                ("document", document_id),
+                data_version,
+                partial(_build_document_details, document_id, False)
+            )
+        if details is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Document not found: {document_id}"
             )
         
-        # Get chunks
-        chunks = get_document_chunks(document_id)
-        
-        return {
-            "document": doc,
-            "num_chunks": len(chunks),
-            "chunks": chunks
-        }
+        response.headers["ETag"] = etag
+        return details
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get document details: {str(e)}", exc_info=True)
+        logger.error("Failed to get document details: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve document: {str(e)}"
-        )
\ No newline at end of file
+        )
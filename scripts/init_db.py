@@ -3,10 +3,9 @@
 Initialize SQLite database schema
 """
 import sys
-sys.path.append('/app/shared')
 
-from database import init_database
-from logger import get_logger
+from shared.database import init_database
+from shared.logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -18,7 +17,7 @@ def main():
         init_database()
         logger.info("Database initialized successfully!")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         sys.exit(1)
 
 
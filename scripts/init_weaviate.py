@@ -4,10 +4,9 @@ Initialize Weaviate schema/collection
 """
 import sys
 import time
-sys.path.append('/app/shared')
 
-from vector_store import get_weaviate_client, init_weaviate_schema
-from logger import get_logger
+from shared.vector_store import get_weaviate_client, init_weaviate_schema
+from shared.logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -19,19 +18,18 @@ def main():
     
     for attempt in range(max_retries):
         try:
-            logger.info(f"Attempting to connect to Weaviate (attempt {attempt + 1}/{max_retries})...")
+            logger.info("Attempting to connect to Weaviate (attempt %s/%s)...", attempt + 1, max_retries)
             client = get_weaviate_client()
             
             logger.info("Initializing Weaviate schema...")
             init_weaviate_schema(client)
             
-            client.close()
             logger.info("Weaviate schema initialized successfully!")
             return
         except Exception as e:
-            logger.warning(f"Failed to initialize Weaviate: {str(e)}")
+            logger.warning("Failed to initialize Weaviate: %s", e)
             if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
+                logger.info("Retrying in %s seconds...", retry_delay)
                 time.sleep(retry_delay)
             else:
                 logger.error("Max retries reached. Failed to initialize Weaviate.")
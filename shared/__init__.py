@@ -1,37 +1,65 @@
 # Shared module initialization
-from .config import settings, get_redis_url, get_weaviate_url, get_ollama_url
-from .logger import get_logger, log_with_context
-from .database import (
-    init_database,
-    create_document_record,
-    update_document_status,
-    get_document,
-    create_chunk_records,
-    get_document_chunks,
-    get_all_documents
-)
-from .redis_queue import (
-    get_redis_connection,
-    get_queue,
-    enqueue_processing_job,
-    enqueue_embedding_job,
-    get_job_status,
-    get_queue_stats
-)
-from .vector_store import (
-    get_weaviate_client,
-    init_weaviate_schema,
-    get_vector_store,
-    add_documents_to_vectorstore,
-    search_similar_documents,
-    delete_document_chunks
-)
-from .schemas import (
-    ProcessingJobData,
-    EmbeddingJobData,
-    ChunkData,
-    DocumentMetadata
-)
+# Submodules are imported on first attribute access so services only load
+# what they use (e.g. the processing worker never imports weaviate)
+import importlib
+
+_EXPORTS = {
+    'settings': 'config',
+    'get_redis_url': 'config',
+    'get_weaviate_url': 'config',
+    'get_ollama_url': 'config',
+    'get_ollama_urls': 'config',
+    'get_logger': 'logger',
+    'log_with_context': 'logger',
+    'init_database': 'database',
+    'create_document_record': 'database',
+    'update_document_status': 'database',
+    'get_document': 'database',
+    'create_chunk_records': 'database',
+    'get_document_chunks': 'database',
+    'get_chunk_counts': 'database',
+    'get_data_version': 'database',
+    'get_all_documents': 'database',
+    'count_documents': 'database',
+    'get_redis_connection_pool': 'redis_queue',
+    'get_redis_connection': 'redis_queue',
+    'get_queue': 'redis_queue',
+    'enqueue_processing_job': 'redis_queue',
+    'enqueue_processing_jobs': 'redis_queue',
+    'enqueue_embedding_job': 'redis_queue',
+    'open_embedding_batches': 'redis_queue',
+    'add_embedding_batch': 'redis_queue',
+    'finish_embedding_batch': 'redis_queue',
+    'cancel_embedding_jobs': 'redis_queue',
+    'enqueue_vector_cleanup_job': 'redis_queue',
+    'get_job_status': 'redis_queue',
+    'get_queue_stats': 'redis_queue',
+    'get_weaviate_client': 'vector_store',
+    'reset_weaviate_client': 'vector_store',
+    'check_weaviate_client': 'vector_store',
+    'init_weaviate_schema': 'vector_store',
+    'get_vector_store': 'vector_store',
+    'add_documents_to_vectorstore': 'vector_store',
+    'add_embeddings_to_vectorstore': 'vector_store',
+    'search_similar_documents': 'vector_store',
+    'delete_document_chunks': 'vector_store',
+    'ProcessingJobData': 'schemas',
+    'EmbeddingJobData': 'schemas',
+    'ChunkData': 'schemas',
+    'DocumentMetadata': 'schemas',
+}
+
+
+def __getattr__(name):
+    """
+    Resolve re-exported names lazily from their submodule
+    """
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     # Config
@@ -39,6 +67,7 @@ __all__ = [
     'get_redis_url',
     'get_weaviate_url',
     'get_ollama_url',
+    'get_ollama_urls',
     # Logger
     'get_logger',
     'log_with_context',
@@ -49,19 +78,32 @@ __all__ = [
     'get_document',
     'create_chunk_records',
     'get_document_chunks',
+    'get_chunk_counts',
+    'get_data_version',
     'get_all_documents',
+    'count_documents',
     # Redis Queue
+    'get_redis_connection_pool',
     'get_redis_connection',
     'get_queue',
     'enqueue_processing_job',
+    'enqueue_processing_jobs',
     'enqueue_embedding_job',
+    'open_embedding_batches',
+    'add_embedding_batch',
+    'finish_embedding_batch',
+    'cancel_embedding_jobs',
+    'enqueue_vector_cleanup_job',
     'get_job_status',
     'get_queue_stats',
     # Vector Store
     'get_weaviate_client',
+    'reset_weaviate_client',
+    'check_weaviate_client',
     'init_weaviate_schema',
     'get_vector_store',
     'add_documents_to_vectorstore',
+    'add_embeddings_to_vectorstore',
     'search_similar_documents',
     'delete_document_chunks',
     # Schemas
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -17,6 +17,9 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "/app/storage/uploads"
     VECTORDB_DIR: str = "/app/storage/vectordb"
     SQLITE_DB_PATH: str = "/app/storage/metadata.db"
+    # SQLite page cache per connection in KB. Each thread has its own
+    # connection (FastAPI's threadpool runs up to 40), so keep this modest
+    SQLITE_CACHE_SIZE_KB: int = 8192
     
     # File Upload Settings
     MAX_FILE_SIZE: int = 52428800  # 50MB in bytes
@@ -26,6 +29,7 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 64  # Per-process connection pool size
     
     # Redis Queue Names
     QUEUE_PROCESSING: str = "processing"
@@ -36,15 +40,33 @@ class Settings(BaseSettings):
     WEAVIATE_PORT: int = 8080
     WEAVIATE_GRPC_PORT: int = 50051
     WEAVIATE_SCHEME: str = "http"
+    WEAVIATE_BATCH_SIZE: int = 100  # Objects per batch insert request, 0 = dynamic sizing
+    WEAVIATE_BATCH_CONCURRENCY: int = 4  # Concurrent batch insert requests
     
     # Ollama Configuration (for embeddings)
     OLLAMA_HOST: str = "host.docker.internal"  # Access host machine
     OLLAMA_PORT: int = 11434
     OLLAMA_MODEL: str = "qwen3-embedding:latest"  # Adjust based on your Ollama setup
-    
+    OLLAMA_URLS: Optional[str] = None  # Comma-separated replica URLs for embedding
+    OLLAMA_NUM_THREAD: int = 0  # CPU threads per embedding request, 0 = Ollama default
+
+    # Embedding Configuration
+    EMBED_BATCH_SIZE: int = 32  # Texts per /api/embed request (e.g. 128 on GPU)
+    EMBED_WORKER_CONCURRENCY: int = 2  # Embedding worker processes per container
+    EMBED_PIPELINE_SIZE: int = 256  # Chunks embedded per stage while the previous stage is stored
+    EMBED_CACHE_SIZE: int = 10000  # In-process LRU entries (~4 KB each, ~1 KB quantized), 0 to disable
+    EMBED_CACHE_TTL: int = 604800  # Redis cache TTL in seconds (7 days), 0 to disable
+    # Store cached vectors as int8 + per-vector scale; cache hits are then
+    # written to Weaviate at int8 precision, so off by default
+    EMBED_CACHE_QUANTIZED: bool = False
+
     # Chunking Configuration
     CHUNK_SIZE: int = 512
     CHUNK_OVERLAP: int = 50
+    CHUNK_BATCH_SIZE: int = 256  # Chunks saved and queued for embedding per batch
+    PROCESS_WORKER_CONCURRENCY: int = 0  # Processing worker processes per container, 0 = CPU count
+    PDF_EXTRACT_WORKERS: int = 4  # Processes extracting pages of one large PDF, 1 to disable
+    PDF_PARALLEL_MIN_PAGES: int = 64  # Smaller PDFs are extracted in-process
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -53,6 +75,7 @@ class Settings(BaseSettings):
     # API Configuration
     API_INGESTION_PORT: int = 8000
     API_QUERY_PORT: int = 8001
+    API_QUERY_WORKERS: int = 0  # Query service uvicorn workers, 0 = min(CPU count, 4)
     
     class Config:
         env_file = ".env"
@@ -84,4 +107,13 @@ def get_ollama_url() -> str:
     """
     Construct Ollama API URL
     """
-    return f"http://{settings.OLLAMA_HOST}:{settings.OLLAMA_PORT}"
\ No newline at end of file
+    return f"http://{settings.OLLAMA_HOST}:{settings.OLLAMA_PORT}"
+
+
+def get_ollama_urls() -> List[str]:
+    """
+    Get Ollama replica URLs for embedding (falls back to the single host)
+    """
+    if settings.OLLAMA_URLS:
+        return [url.strip().rstrip("/") for url in settings.OLLAMA_URLS.split(",") if url.strip()]
+    return [get_ollama_url()]
\ No newline at end of file
@@ -1,10 +1,17 @@
+import logging
+import os
 import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Union
 from pathlib import Path
 from contextlib import contextmanager
-from config import settings
-from logger import get_logger
+
+import orjson
+
+from .config import settings
+from .logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -43,30 +50,188 @@ CREATE TABLE IF NOT EXISTS chunks (
 CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
 CREATE INDEX IF NOT EXISTS idx_documents_upload_time ON documents(upload_time);
 CREATE INDEX IF NOT EXISTS idx_chunks_document_id ON chunks(document_id);
-CREATE INDEX IF NOT EXISTS idx_chunks_chunk_index ON chunks(document_id, chunk_index);
+-- Covering index for chunk listings without text; it also serves
+-- (document_id, chunk_index) ordering, so the older index is dropped
+CREATE INDEX IF NOT EXISTS idx_chunks_meta ON chunks(document_id, chunk_index, chunk_id, chunk_size);
+DROP INDEX IF EXISTS idx_chunks_chunk_index;
+
+-- Write counter, bumped once per write transaction by the write helpers so
+-- readers can cache until data changes
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+
+-- Per-row triggers used to bump it, costing an extra UPDATE per chunk insert
+DROP TRIGGER IF EXISTS documents_insert_version;
+DROP TRIGGER IF EXISTS documents_update_version;
+DROP TRIGGER IF EXISTS documents_delete_version;
+DROP TRIGGER IF EXISTS chunks_insert_version;
+DROP TRIGGER IF EXISTS chunks_update_version;
+DROP TRIGGER IF EXISTS chunks_delete_version;
+"""
+
+
+# Hot statements, kept as constants so every call reuses the same compiled
+# statement from the connection's statement cache
+INSERT_DOCUMENT_SQL = """
+    INSERT INTO documents (
+        document_id, filename, file_path, file_type, 
+        file_size, status, upload_time
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# One statement for every status: the timestamp columns only change for the
+# statuses that set them, so no per-status SQL variants are needed
+UPDATE_STATUS_SQL = """
+    UPDATE documents 
+    SET status = ?, 
+        processing_started_time = CASE WHEN ? = 'processing'
+            THEN ? ELSE processing_started_time END,
+        processing_completed_time = CASE WHEN ? IN ('completed', 'failed')
+            THEN ? ELSE processing_completed_time END,
+        error_message = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE document_id = ?
+"""
+
+SELECT_DOCUMENT_SQL = "SELECT * FROM documents WHERE document_id = ?"
+
+INSERT_CHUNK_SQL = """
+    INSERT INTO chunks (
+        chunk_id, document_id, chunk_index, 
+        chunk_text, chunk_size, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_DOCUMENTS_SQL = "SELECT * FROM documents ORDER BY upload_time DESC LIMIT ? OFFSET ?"
+
+SELECT_DOCUMENTS_BY_STATUS_SQL = """
+    SELECT * FROM documents WHERE status = ?
+    ORDER BY upload_time DESC LIMIT ? OFFSET ?
+"""
+
+COUNT_DOCUMENTS_SQL = "SELECT COUNT(*) FROM documents"
+
+COUNT_DOCUMENTS_BY_STATUS_SQL = "SELECT COUNT(*) FROM documents WHERE status = ?"
+
+SELECT_DOCUMENT_CHUNKS_SQL = "SELECT * FROM chunks WHERE document_id = ? ORDER BY chunk_index"
+
+# Run in the same transaction as every write to documents or chunks
+BUMP_DATA_VERSION_SQL = "UPDATE data_version SET version = version + 1 WHERE id = 1"
+
+SELECT_DATA_VERSION_SQL = "SELECT version FROM data_version WHERE id = 1"
+
+# Answered from idx_chunks_meta alone, without reading chunk_text
+SELECT_DOCUMENT_CHUNK_SIZES_SQL = """
+    SELECT chunk_id, document_id, chunk_index, chunk_size
+    FROM chunks WHERE document_id = ? ORDER BY chunk_index
 """
 
+# Bind datetimes with a direct isoformat call instead of the default adapter
+# (deprecated since Python 3.12); same "YYYY-MM-DD HH:MM:SS.ffffff" text, so
+# upload_time keeps sub-second ordering
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+# Per-connection settings: fsync only at WAL checkpoints (safe with WAL),
+# temp tables in memory, a SQLITE_CACHE_SIZE_KB page cache (per thread, as
+# every thread has its own connection), 256 MB memory-mapped reads shared
+# through the OS page cache, and enforced foreign keys so ON DELETE CASCADE
+# applies
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+# journal_mode=WAL is stored in the database file, so it is set once per
+# process, together with the other first-connection setup
+_wal_enabled = False
+
+# One connection per thread (sqlite3 connections are not thread-safe),
+# reused across calls so PRAGMAs and the page cache survive between them
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """
+    Open and configure a new database connection
+    """
+    global _wal_enabled
+    
+    if not _wal_enabled:
+        # Ensure directory exists (once per process, not per connection)
+        Path(settings.SQLITE_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    
+    # A larger statement cache keeps every hot statement compiled
+    conn = sqlite3.connect(settings.SQLITE_DB_PATH, cached_statements=256)
+    if not _wal_enabled:
+        # 8 KB pages hold more chunk rows per page; this only takes effect
+        # on a new database, so it must come before switching to WAL
+        conn.execute("PRAGMA page_size=8192")
+        # WAL: readers no longer block the writer and commits need fewer
+        # fsyncs (in-memory databases cannot use it)
+        if settings.SQLITE_DB_PATH != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled = True
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _column_names(cursor: sqlite3.Cursor) -> List[str]:
+    """
+    Get the column names of a cursor's result set
+    """
+    return [column[0] for column in cursor.description]
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """
+    Fetch all rows as dictionaries
+    Rows come back as plain tuples; zipping them with the column names
+    read once is cheaper than building sqlite3.Row objects and converting
+    each one
+    """
+    columns = _column_names(cursor)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _encode_metadata(metadata: Union[str, Dict[str, Any]]) -> str:
+    """
+    Encode chunk metadata for the metadata column, accepting dicts or JSON text
+    """
+    if isinstance(metadata, str):
+        return metadata
+    return orjson.dumps(metadata).decode()
+
 
 @contextmanager
 def get_db_connection():
     """
     Context manager for database connections
+    Yields this thread's connection, opening it on first use; commits on
+    success and rolls back on error, but keeps the connection open
     """
-    # Ensure directory exists
-    db_path = Path(settings.SQLITE_DB_PATH)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = getattr(_local, "conn", None)
+    pid = os.getpid()
+    if conn is None or _local.pid != pid:
+        # A connection must not be used across fork (RQ work horses),
+        # so a forked child opens its own
+        conn = _connect()
+        _local.conn = conn
+        _local.pid = pid
     
-    conn = sqlite3.connect(settings.SQLITE_DB_PATH)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
     try:
         yield conn
         conn.commit()
     except Exception as e:
         conn.rollback()
-        logger.error(f"Database error: {str(e)}")
+        logger.error("Database error: %s", e)
         raise
-    finally:
-        conn.close()
 
 
 def init_database():
@@ -78,7 +243,7 @@ def init_database():
             conn.executescript(SCHEMA)
         logger.info("Database initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         raise
 
 
@@ -94,12 +259,7 @@ def create_document_record(metadata: Dict[str, Any]) -> bool:
     """
     try:
         with get_db_connection() as conn:
-            conn.execute("""
-                INSERT INTO documents (
-                    document_id, filename, file_path, file_type, 
-                    file_size, status, upload_time
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            conn.execute(INSERT_DOCUMENT_SQL, (
                 metadata["document_id"],
                 metadata["filename"],
                 metadata["file_path"],
@@ -108,10 +268,12 @@ def create_document_record(metadata: Dict[str, Any]) -> bool:
                 metadata["status"],
                 metadata["upload_time"]
             ))
-        logger.info(f"Document record created: {metadata['document_id']}")
+            conn.execute(BUMP_DATA_VERSION_SQL)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Document record created: %s", metadata["document_id"])
         return True
     except Exception as e:
-        logger.error(f"Failed to create document record: {str(e)}")
+        logger.error("Failed to create document record: %s", e)
         raise
 
 
@@ -133,34 +295,19 @@ def update_document_status(
     """
     try:
         with get_db_connection() as conn:
-            timestamp_field = None
-            if status == "processing":
-                timestamp_field = "processing_started_time"
-            elif status in ["completed", "failed"]:
-                timestamp_field = "processing_completed_time"
-            
-            if timestamp_field:
-                conn.execute(f"""
-                    UPDATE documents 
-                    SET status = ?, 
-                        {timestamp_field} = ?,
-                        error_message = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE document_id = ?
-                """, (status, datetime.now(), error_message, document_id))
-            else:
-                conn.execute("""
-                    UPDATE documents 
-                    SET status = ?, 
-                        error_message = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE document_id = ?
-                """, (status, error_message, document_id))
+            # Second precision is enough for status timestamps; bind a str
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            conn.execute(
+                UPDATE_STATUS_SQL,
+                (status, status, now, status, now, error_message, document_id)
+            )
+            conn.execute(BUMP_DATA_VERSION_SQL)
         
-        logger.info(f"Document status updated: {document_id} -> {status}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Document status updated: %s -> %s", document_id, status)
         return True
     except Exception as e:
-        logger.error(f"Failed to update document status: {str(e)}")
+        logger.error("Failed to update document status: %s", e)
         raise
 
 
@@ -176,22 +323,19 @@ def get_document(document_id: str) -> Optional[Dict[str, Any]]:
     """
     try:
         with get_db_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM documents WHERE document_id = ?",
-                (document_id,)
-            )
+            cursor = conn.execute(SELECT_DOCUMENT_SQL, (document_id,))
             row = cursor.fetchone()
             if row:
-                return dict(row)
+                return dict(zip(_column_names(cursor), row))
             return None
     except Exception as e:
-        logger.error(f"Failed to retrieve document: {str(e)}")
+        logger.error("Failed to retrieve document: %s", e)
         raise
 
 
 def create_chunk_records(chunks: List[Dict[str, Any]]) -> bool:
     """
-    Create multiple chunk records
+    Create multiple chunk records in a single transaction
     
     Args:
         chunks: List of chunk dictionaries
@@ -201,74 +345,150 @@ def create_chunk_records(chunks: List[Dict[str, Any]]) -> bool:
     """
     try:
         with get_db_connection() as conn:
-            conn.executemany("""
-                INSERT INTO chunks (
-                    chunk_id, document_id, chunk_index, 
-                    chunk_text, chunk_size, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, [
+            # Take the write lock up front so the whole batch is one
+            # transaction with a single commit
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT_CHUNK_SQL, (
                 (
                     chunk["chunk_id"],
                     chunk["document_id"],
                     chunk["chunk_index"],
                     chunk["chunk_text"],
                     chunk["chunk_size"],
-                    chunk.get("metadata", "{}")
+                    _encode_metadata(chunk.get("metadata", "{}"))
                 ) for chunk in chunks
-            ])
-        logger.info(f"Created {len(chunks)} chunk records")
+            ))
+            # Once per batch rather than once per row
+            conn.execute(BUMP_DATA_VERSION_SQL)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Created %s chunk records", len(chunks))
         return True
     except Exception as e:
-        logger.error(f"Failed to create chunk records: {str(e)}")
+        logger.error("Failed to create chunk records: %s", e)
         raise
 
 
-def get_document_chunks(document_id: str) -> List[Dict[str, Any]]:
+def get_document_chunks(document_id: str, with_text: bool = True) -> List[Dict[str, Any]]:
     """
     Retrieve all chunks for a document
     
     Args:
         document_id: Document ID
+        with_text: Include chunk text and metadata; without them only
+            chunk_id, document_id, chunk_index and chunk_size are read
     
     Returns:
         List of chunk dictionaries
     """
+    sql = SELECT_DOCUMENT_CHUNKS_SQL if with_text else SELECT_DOCUMENT_CHUNK_SIZES_SQL
     try:
         with get_db_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM chunks WHERE document_id = ? ORDER BY chunk_index",
-                (document_id,)
-            )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            cursor = conn.execute(sql, (document_id,))
+            return _rows_to_dicts(cursor)
     except Exception as e:
-        logger.error(f"Failed to retrieve chunks: {str(e)}")
+        logger.error("Failed to retrieve chunks: %s", e)
         raise
 
 
-def get_all_documents(status: Optional[str] = None) -> List[Dict[str, Any]]:
+def get_chunk_counts(status: Optional[str] = None) -> Dict[str, int]:
     """
-    Retrieve all documents, optionally filtered by status
+    Count chunks per document in a single query
     
     Args:
-        status: Optional status filter
+        status: Optional document status filter
     
     Returns:
-        List of document dictionaries
+        Dictionary of document ID to chunk count
     """
     try:
         with get_db_connection() as conn:
             if status:
-                cursor = conn.execute(
-                    "SELECT * FROM documents WHERE status = ? ORDER BY upload_time DESC",
-                    (status,)
-                )
+                cursor = conn.execute("""
+                    SELECT c.document_id, COUNT(*)
+                    FROM chunks c
+                    JOIN documents d ON d.document_id = c.document_id
+                    WHERE d.status = ?
+                    GROUP BY c.document_id
+                """, (status,))
             else:
                 cursor = conn.execute(
-                    "SELECT * FROM documents ORDER BY upload_time DESC"
+                    "SELECT document_id, COUNT(*) FROM chunks GROUP BY document_id"
                 )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return dict(cursor.fetchall())
+    except Exception as e:
+        logger.error("Failed to count chunks: %s", e)
+        raise
+
+
+def get_all_documents(
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """
+    Retrieve documents, newest first, optionally filtered by status
+    Rows are yielded as they are read, so only one page is held in memory
+    
+    Args:
+        status: Optional status filter
+        limit: Optional maximum number of documents
+        offset: Number of documents to skip
+    
+    Returns:
+        Iterator of document dictionaries
+    """
+    # LIMIT -1 means no limit in SQLite, so one statement serves both cases
+    limit = -1 if limit is None else limit
+    try:
+        with get_db_connection() as conn:
+            if status:
+                cursor = conn.execute(SELECT_DOCUMENTS_BY_STATUS_SQL, (status, limit, offset))
+            else:
+                cursor = conn.execute(SELECT_DOCUMENTS_SQL, (limit, offset))
+            columns = _column_names(cursor)
+            for row in cursor:
+                yield dict(zip(columns, row))
+    except Exception as e:
+        logger.error("Failed to retrieve documents: %s", e)
+        raise
+
+
+def count_documents(status: Optional[str] = None) -> int:
+    """
+    Count documents, optionally filtered by status
+    Answered from an index, without reading the rows
+    
+    Args:
+        status: Optional status filter
+    
+    Returns:
+        Number of documents
+    """
+    try:
+        with get_db_connection() as conn:
+            if status:
+                row = conn.execute(COUNT_DOCUMENTS_BY_STATUS_SQL, (status,)).fetchone()
+            else:
+                row = conn.execute(COUNT_DOCUMENTS_SQL).fetchone()
+            return row[0]
+    except Exception as e:
+        logger.error("Failed to count documents: %s", e)
+        raise
+
+
+def get_data_version() -> int:
+    """
+    Get the write counter for documents and chunks
+    Every write helper in this module bumps it in the same transaction as
+    its write, so it can key caches of query results
+    
+    Returns:
+        Current data version
+    """
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute(SELECT_DATA_VERSION_SQL).fetchone()
+            return row[0] if row else 0
     except Exception as e:
-        logger.error(f"Failed to retrieve documents: {str(e)}")
+        logger.error("Failed to get data version: %s", e)
         raise
\ No newline at end of file
@@ -1,9 +1,16 @@
 import logging
 import sys
-import json
-from datetime import datetime
+import time
 from typing import Any, Dict
-from config import settings
+
+import orjson
+
+from .config import settings
+
+# Skip thread/process lookups on every record; no formatter uses them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 
 
 class JSONFormatter(logging.Formatter):
@@ -11,9 +18,24 @@ class JSONFormatter(logging.Formatter):
     Custom JSON formatter for structured logging
     """
     
+    # Last formatted second as (epoch second, "YYYY-MM-DDTHH:MM:SS")
+    _cached_second = (None, "")
+    
+    def _format_timestamp(self, created: float) -> str:
+        """
+        Format a record's creation time like datetime.utcnow().isoformat()
+        The seconds part only changes once per second, so it is cached
+        """
+        second = int(created)
+        cached_second, prefix = self._cached_second
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._cached_second = (second, prefix)
+        return "%s.%06d" % (prefix, int((created - second) * 1_000_000))
+    
     def format(self, record: logging.LogRecord) -> str:
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -29,7 +51,7 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
         
-        return json.dumps(log_data)
+        return orjson.dumps(log_data).decode()
 
 
 class TextFormatter(logging.Formatter):
@@ -44,6 +66,12 @@ class TextFormatter(logging.Formatter):
         )
 
 
+# Level and formatter are fixed by settings, so they are resolved once and
+# the formatter instance is shared by every logger's handler
+_LEVEL = getattr(logging, settings.LOG_LEVEL.upper())
+_FORMATTER = JSONFormatter() if settings.LOG_FORMAT.lower() == "json" else TextFormatter()
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a configured logger instance
@@ -60,19 +88,12 @@ def get_logger(name: str) -> logging.Logger:
     if logger.handlers:
         return logger
     
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    logger.setLevel(_LEVEL)
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
-    
-    # Choose formatter based on configuration
-    if settings.LOG_FORMAT.lower() == "json":
-        formatter = JSONFormatter()
-    else:
-        formatter = TextFormatter()
-    
-    console_handler.setFormatter(formatter)
+    console_handler.setLevel(_LEVEL)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
     
     # Prevent propagation to root logger
@@ -1,30 +1,67 @@
 import redis
 from rq import Queue
-from typing import Dict, Any, Optional
-from config import settings, get_redis_url
-from logger import get_logger
+from rq.job import Job
+from typing import Dict, Any, List, Optional
+from .config import settings, get_redis_url
+from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Connection pools shared by every client in this process, keyed by
+# decode_responses (RQ and binary payloads need undecoded responses)
+_connection_pools: Dict[bool, redis.BlockingConnectionPool] = {}
 
-def get_redis_connection() -> redis.Redis:
+
+def get_redis_connection_pool(decode_responses: bool = True) -> redis.BlockingConnectionPool:
     """
-    Get Redis connection
+    Get the process-wide Redis connection pool
+    
+    Args:
+        decode_responses: Whether connections decode responses to str
     
     Returns:
-        Redis connection instance
+        BlockingConnectionPool instance
     """
-    try:
-        redis_conn = redis.from_url(
+    pool = _connection_pools.get(decode_responses)
+    if pool is None:
+        pool = redis.BlockingConnectionPool.from_url(
             get_redis_url(),
-            decode_responses=True
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_keepalive=True,
+            health_check_interval=30,
+            decode_responses=decode_responses
         )
-        # Test connection
-        redis_conn.ping()
-        return redis_conn
-    except Exception as e:
-        logger.error(f"Failed to connect to Redis: {str(e)}")
-        raise
+        _connection_pools[decode_responses] = pool
+    return pool
+
+
+# Clients and queues reused across calls; the pool reconnects dropped
+# connections (health_check_interval), so no ping is needed per call
+_redis_clients: Dict[bool, redis.Redis] = {}
+_queues: Dict[str, Queue] = {}
+
+
+def get_redis_connection(decode_responses: bool = True) -> redis.Redis:
+    """
+    Get Redis connection backed by the shared connection pool
+    
+    Args:
+        decode_responses: Whether responses are decoded to str
+    
+    Returns:
+        Redis connection instance
+    """
+    redis_conn = _redis_clients.get(decode_responses)
+    if redis_conn is None:
+        try:
+            redis_conn = redis.Redis(
+                connection_pool=get_redis_connection_pool(decode_responses)
+            )
+        except Exception as e:
+            logger.error("Failed to connect to Redis: %s", e)
+            raise
+        _redis_clients[decode_responses] = redis_conn
+    return redis_conn
 
 
 def get_queue(queue_name: str) -> Queue:
@@ -37,12 +74,15 @@ def get_queue(queue_name: str) -> Queue:
     Returns:
         Queue instance
     """
-    try:
-        redis_conn = get_redis_connection()
-        return Queue(queue_name, connection=redis_conn)
-    except Exception as e:
-        logger.error(f"Failed to get queue {queue_name}: {str(e)}")
-        raise
+    queue = _queues.get(queue_name)
+    if queue is None:
+        try:
+            queue = Queue(queue_name, connection=get_redis_connection())
+        except Exception as e:
+            logger.error("Failed to get queue %s: %s", queue_name, e)
+            raise
+        _queues[queue_name] = queue
+    return queue
 
 
 def enqueue_processing_job(job_data: Dict[str, Any]) -> str:
@@ -68,7 +108,7 @@ def enqueue_processing_job(job_data: Dict[str, Any]) -> str:
         )
         
         logger.info(
-            f"Processing job enqueued",
+            "Processing job enqueued",
             extra={
                 "job_id": job.id,
                 "document_id": job_data.get("document_id"),
@@ -78,7 +118,46 @@ def enqueue_processing_job(job_data: Dict[str, Any]) -> str:
         
         return job.id
     except Exception as e:
-        logger.error(f"Failed to enqueue processing job: {str(e)}")
+        logger.error("Failed to enqueue processing job: %s", e)
+        raise
+
+
+def enqueue_processing_jobs(job_datas: List[Dict[str, Any]]) -> List[str]:
+    """
+    Enqueue several document processing jobs in one Redis round trip
+    
+    Args:
+        job_datas: Job data for each document (see enqueue_processing_job)
+    
+    Returns:
+        Job IDs, in the same order
+    """
+    try:
+        queue = get_queue(settings.QUEUE_PROCESSING)
+        
+        # enqueue_many writes every job in a single pipeline
+        jobs = queue.enqueue_many([
+            Queue.prepare_data(
+                'tasks.process_document.process_document_task',
+                args=(job_data,),
+                timeout='10m',
+                result_ttl=86400,
+                failure_ttl=86400
+            )
+            for job_data in job_datas
+        ])
+        
+        logger.info(
+            "Processing jobs enqueued",
+            extra={
+                "job_ids": [job.id for job in jobs],
+                "queue": settings.QUEUE_PROCESSING
+            }
+        )
+        
+        return [job.id for job in jobs]
+    except Exception as e:
+        logger.error("Failed to enqueue processing jobs: %s", e)
         raise
 
 
@@ -104,7 +183,7 @@ def enqueue_embedding_job(job_data: Dict[str, Any]) -> str:
         )
         
         logger.info(
-            f"Embedding job enqueued",
+            "Embedding job enqueued",
             extra={
                 "job_id": job.id,
                 "document_id": job_data.get("document_id"),
@@ -114,7 +193,132 @@ def enqueue_embedding_job(job_data: Dict[str, Any]) -> str:
         
         return job.id
     except Exception as e:
-        logger.error(f"Failed to enqueue embedding job: {str(e)}")
+        logger.error("Failed to enqueue embedding job: %s", e)
+        raise
+
+
+def _pending_embeddings_key(document_id: str) -> str:
+    """
+    Redis key counting a document's outstanding embedding batches
+    """
+    return f"embedding:pending:{document_id}"
+
+
+def open_embedding_batches(document_id: str):
+    """
+    Start tracking embedding batches for a document
+    The counter starts at 1, a token held by the processing task until all
+    batches are queued, so it cannot reach zero while batches are still
+    being added
+    
+    Args:
+        document_id: Document ID
+    """
+    try:
+        get_redis_connection().set(_pending_embeddings_key(document_id), 1, ex=86400)
+    except Exception as e:
+        logger.error("Failed to open embedding batches: %s", e)
+        raise
+
+
+def add_embedding_batch(document_id: str):
+    """
+    Count one more outstanding embedding batch for a document
+    
+    Args:
+        document_id: Document ID
+    """
+    try:
+        get_redis_connection().incr(_pending_embeddings_key(document_id))
+    except Exception as e:
+        logger.error("Failed to add embedding batch: %s", e)
+        raise
+
+
+def finish_embedding_batch(document_id: str) -> bool:
+    """
+    Mark one embedding batch (or the processing token) as finished
+    
+    Args:
+        document_id: Document ID
+    
+    Returns:
+        True if this was the last outstanding batch for the document
+    """
+    try:
+        redis_conn = get_redis_connection()
+        key = _pending_embeddings_key(document_id)
+        remaining = redis_conn.decr(key)
+        if remaining <= 0:
+            redis_conn.delete(key)
+            return True
+        return False
+    except Exception as e:
+        logger.error("Failed to finish embedding batch: %s", e)
+        raise
+
+
+def cancel_embedding_jobs(job_ids: List[str]) -> int:
+    """
+    Remove embedding jobs that are still waiting in the queue
+    Jobs a worker has already started are left to finish
+    
+    Args:
+        job_ids: Embedding job IDs
+    
+    Returns:
+        Number of jobs removed
+    """
+    if not job_ids:
+        return 0
+    
+    try:
+        queue = get_queue(settings.QUEUE_EMBEDDING)
+        
+        # One round trip for every LREM; only jobs actually taken off the
+        # queue have their hashes deleted
+        pipe = queue.connection.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.lrem(queue.key, 1, job_id)
+        removed = [job_id for job_id, count in zip(job_ids, pipe.execute()) if count]
+        if removed:
+            queue.connection.delete(*(Job.key_for(job_id) for job_id in removed))
+        
+        logger.info("Cancelled %s of %s embedding jobs", len(removed), len(job_ids))
+        return len(removed)
+    except Exception as e:
+        logger.error("Failed to cancel embedding jobs: %s", e)
+        raise
+
+
+def enqueue_vector_cleanup_job(document_id: str) -> str:
+    """
+    Enqueue deletion of a document's vectors on the embedding queue
+    Queued behind the document's embedding jobs, so it deletes what they
+    stored; a job still running at that point checks the document status
+    itself once it has stored its vectors
+    
+    Args:
+        document_id: Document ID
+    
+    Returns:
+        Job ID
+    """
+    try:
+        queue = get_queue(settings.QUEUE_EMBEDDING)
+        
+        job = queue.enqueue(
+            'tasks.embed_document.delete_document_vectors_task',
+            {"document_id": document_id},
+            job_timeout='5m',
+            result_ttl=86400,
+            failure_ttl=86400
+        )
+        
+        logger.info("Vector cleanup job enqueued: %s for document %s", job.id, document_id)
+        return job.id
+    except Exception as e:
+        logger.error("Failed to enqueue vector cleanup job: %s", e)
         raise
 
 
@@ -145,7 +349,7 @@ def get_job_status(job_id: str, queue_name: str) -> Optional[Dict[str, Any]]:
             "exc_info": job.exc_info
         }
     except Exception as e:
-        logger.error(f"Failed to get job status: {str(e)}")
+        logger.error("Failed to get job status: %s", e)
         return None
 
 
@@ -162,15 +366,26 @@ def get_queue_stats(queue_name: str) -> Dict[str, int]:
     try:
         queue = get_queue(queue_name)
         
+        # All counts in one round trip; registry.count would also run a
+        # cleanup pass per registry, which RQ workers already do periodically
+        pipe = queue.connection.pipeline(transaction=False)
+        pipe.llen(queue.key)
+        pipe.zcard(queue.started_job_registry.key)
+        pipe.zcard(queue.finished_job_registry.key)
+        pipe.zcard(queue.failed_job_registry.key)
+        pipe.zcard(queue.deferred_job_registry.key)
+        pipe.zcard(queue.scheduled_job_registry.key)
+        queued, started, finished, failed, deferred, scheduled = pipe.execute()
+        
         return {
             "queue_name": queue_name,
-            "queued": len(queue),
-            "started": queue.started_job_registry.count,
-            "finished": queue.finished_job_registry.count,
-            "failed": queue.failed_job_registry.count,
-            "deferred": queue.deferred_job_registry.count,
-            "scheduled": queue.scheduled_job_registry.count
+            "queued": queued,
+            "started": started,
+            "finished": finished,
+            "failed": failed,
+            "deferred": deferred,
+            "scheduled": scheduled
         }
     except Exception as e:
-        logger.error(f"Failed to get queue stats: {str(e)}")
+        logger.error("Failed to get queue stats: %s", e)
         return {}
\ No newline at end of file
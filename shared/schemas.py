@@ -1,3 +1,9 @@
+"""
+Schemas for payloads passed between services
+Job payloads come from our own producers and are not validated on the
+consumer side; build a typed view of one with Model.model_construct(**payload),
+which skips validation, and keep full validation for external input
+"""
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -1,12 +1,16 @@
+import atexit
+import os
+import threading
 from typing import List, Dict, Any, Optional
 import weaviate
 from weaviate.classes.init import Auth
 from weaviate.classes.config import Configure, Property, DataType
+from weaviate.classes.query import Filter
 from langchain_weaviate import WeaviateVectorStore
 from langchain_core.documents import Document
 
-from config import settings, get_weaviate_url
-from logger import get_logger
+from .config import settings, get_weaviate_url
+from .logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -15,31 +19,98 @@ logger = get_logger(__name__)
 COLLECTION_NAME = "DocumentChunk"
 
 
+# Process-wide client, connected on first use and closed at exit
+_client: Optional[weaviate.WeaviateClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
 def get_weaviate_client() -> weaviate.WeaviateClient:
     """
-    Get Weaviate client instance
+    Get the process-wide Weaviate client, connecting on first use
     
     Returns:
         Weaviate client
     """
+    global _client, _client_pid
+    
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    
+    with _client_lock:
+        # gRPC channels do not survive fork, so a forked child connects anew
+        if _client is None or _client_pid != pid:
+            try:
+                client = weaviate.connect_to_custom(
+                    http_host=settings.WEAVIATE_HOST,
+                    http_port=settings.WEAVIATE_PORT,
+                    http_secure=False,
+                    grpc_host=settings.WEAVIATE_HOST,
+                    grpc_port=settings.WEAVIATE_GRPC_PORT,
+                    grpc_secure=False,
+                )
+                
+                if not client.is_ready():
+                    client.close()
+                    raise ConnectionError("Weaviate client is not ready")
+                
+                logger.info("Connected to Weaviate successfully")
+            except Exception as e:
+                logger.error("Failed to connect to Weaviate: %s", e)
+                raise
+            
+            _client = client
+            _client_pid = pid
+            atexit.register(client.close)
+    
+    return _client
+
+
+def reset_weaviate_client(client: Optional[weaviate.WeaviateClient] = None):
+    """
+    Close and drop the process-wide client so the next call reconnects
+    
+    Args:
+        client: Only drop the shared client if it is this one (another
+            caller may already have replaced it)
+    """
+    global _client, _client_pid
+    
+    with _client_lock:
+        if _client is None or (client is not None and _client is not client):
+            return
+        stale = _client
+        _client = None
+        _client_pid = None
+    
     try:
-        client = weaviate.connect_to_custom(
-            http_host=settings.WEAVIATE_HOST,
-            http_port=settings.WEAVIATE_PORT,
-            http_secure=False,
-            grpc_host=settings.WEAVIATE_HOST,
-            grpc_port=settings.WEAVIATE_GRPC_PORT,
-            grpc_secure=False,
-        )
-        
-        if not client.is_ready():
-            raise ConnectionError("Weaviate client is not ready")
-        
-        logger.info("Connected to Weaviate successfully")
-        return client
+        stale.close()
     except Exception as e:
-        logger.error(f"Failed to connect to Weaviate: {str(e)}")
-        raise
+        logger.warning("Failed to close Weaviate client: %s", e)
+    logger.info("Dropped Weaviate client; the next call reconnects")
+
+
+def check_weaviate_client(client: weaviate.WeaviateClient) -> bool:
+    """
+    Check that a client can still reach Weaviate
+    A client that is not ready, or fails the check, is dropped from the
+    process-wide slot so callers stop getting a dead connection
+    
+    Args:
+        client: Weaviate client
+    
+    Returns:
+        True if Weaviate is ready
+    """
+    try:
+        if client.is_ready():
+            return True
+    except Exception as e:
+        logger.warning("Weaviate readiness check failed: %s", e)
+    
+    reset_weaviate_client(client)
+    return False
 
 
 def init_weaviate_schema(client: Optional[weaviate.WeaviateClient] = None):
@@ -47,17 +118,15 @@ def init_weaviate_schema(client: Optional[weaviate.WeaviateClient] = None):
     Initialize Weaviate schema/collection
     
     Args:
-        client: Optional Weaviate client (creates new if not provided)
+        client: Optional Weaviate client (uses the shared client if not provided)
     """
-    should_close = False
     if client is None:
         client = get_weaviate_client()
-        should_close = True
     
     try:
         # Check if collection exists
         if client.collections.exists(COLLECTION_NAME):
-            logger.info(f"Collection {COLLECTION_NAME} already exists")
+            logger.info("Collection %s already exists", COLLECTION_NAME)
             return
         
         # Create collection with properties
@@ -100,13 +169,10 @@ def init_weaviate_schema(client: Optional[weaviate.WeaviateClient] = None):
             vectorizer_config=Configure.Vectorizer.none(),
         )
         
-        logger.info(f"Collection {COLLECTION_NAME} created successfully")
+        logger.info("Collection %s created successfully", COLLECTION_NAME)
     except Exception as e:
-        logger.error(f"Failed to initialize Weaviate schema: {str(e)}")
+        logger.error("Failed to initialize Weaviate schema: %s", e)
         raise
-    finally:
-        if should_close:
-            client.close()
 
 
 def get_vector_store(embeddings) -> WeaviateVectorStore:
@@ -135,7 +201,7 @@ def get_vector_store(embeddings) -> WeaviateVectorStore:
         logger.info("Vector store initialized")
         return vector_store
     except Exception as e:
-        logger.error(f"Failed to get vector store: {str(e)}")
+        logger.error("Failed to get vector store: %s", e)
         raise
 
 
@@ -146,6 +212,8 @@ def add_documents_to_vectorstore(
 ) -> List[str]:
     """
     Add documents to vector store
+    All texts are embedded in one embed_documents call and written through
+    the Weaviate batch API, instead of LangChain's per-document path
     
     Args:
         vector_store: Vector store instance
@@ -161,11 +229,91 @@ def add_documents_to_vectorstore(
             for doc, metadata in zip(documents, metadatas):
                 doc.metadata.update(metadata)
         
-        ids = vector_store.add_documents(documents)
-        logger.info(f"Added {len(ids)} documents to vector store")
+        texts = [doc.page_content for doc in documents]
+        vectors = vector_store.embeddings.embed_documents(texts)
+        
+        # WeaviateVectorStore has no public accessor for its client
+        ids = add_embeddings_to_vectorstore(
+            vector_store._client,
+            texts,
+            vectors,
+            metadatas=[doc.metadata for doc in documents]
+        )
+        logger.info("Added %s documents to vector store", len(ids))
         return ids
     except Exception as e:
-        logger.error(f"Failed to add documents to vector store: {str(e)}")
+        logger.error("Failed to add documents to vector store: %s", e)
+        raise
+
+
+def _open_batch(client: weaviate.WeaviateClient):
+    """
+    Open a batch context for inserts
+    A WEAVIATE_BATCH_SIZE of 0 lets the client size batches dynamically
+    from server load; otherwise fixed-size batches are sent concurrently
+    """
+    if settings.WEAVIATE_BATCH_SIZE <= 0:
+        return client.batch.dynamic()
+    return client.batch.fixed_size(
+        batch_size=settings.WEAVIATE_BATCH_SIZE,
+        concurrent_requests=settings.WEAVIATE_BATCH_CONCURRENCY
+    )
+
+
+def add_embeddings_to_vectorstore(
+    client: weaviate.WeaviateClient,
+    texts: List[str],
+    embeddings: List[List[float]],
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    ids: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Add texts with pre-computed embeddings to vector store
+    
+    Args:
+        client: Weaviate client
+        texts: List of chunk texts
+        embeddings: List of embedding vectors (one per text)
+        metadatas: Optional list of metadata dictionaries
+        ids: Optional object UUIDs; existing objects with the same UUID
+            are overwritten, making re-inserts idempotent
+    
+    Returns:
+        List of object IDs
+    """
+    try:
+        if len(texts) != len(embeddings):
+            raise ValueError("Number of texts and embeddings must match")
+        
+        if ids is not None and len(ids) != len(texts):
+            raise ValueError("Number of texts and ids must match")
+        
+        if metadatas is None:
+            metadatas = [{}] * len(texts)
+        if ids is None:
+            ids = [None] * len(texts)
+        
+        object_ids = []
+        with _open_batch(client) as batch:
+            for text, vector, metadata, object_uuid in zip(texts, embeddings, metadatas, ids):
+                object_id = batch.add_object(
+                    collection=COLLECTION_NAME,
+                    properties={**metadata, "text": text},
+                    vector=vector,
+                    uuid=object_uuid
+                )
+                object_ids.append(str(object_id))
+        
+        failed_objects = client.batch.failed_objects
+        if failed_objects:
+            raise RuntimeError(
+                f"Failed to insert {len(failed_objects)} objects: {failed_objects[0].message}"
+            )
+        
+        logger.info("Added %s embeddings to vector store", len(object_ids))
+        return object_ids
+    except Exception as e:
+        logger.error("Failed to add embeddings to vector store: %s", e)
         raise
 
 
@@ -197,10 +345,10 @@ def search_similar_documents(
         else:
             results = vector_store.similarity_search(query, k=k)
         
-        logger.info(f"Found {len(results)} similar documents for query")
+        logger.info("Found %s similar documents for query", len(results))
         return results
     except Exception as e:
-        logger.error(f"Failed to search similar documents: {str(e)}")
+        logger.error("Failed to search similar documents: %s", e)
         raise
 
 
@@ -213,34 +361,25 @@ def delete_document_chunks(
     
     Args:
         document_id: Document ID
-        client: Optional Weaviate client
+        client: Optional Weaviate client (uses the shared client if not provided)
     
     Returns:
         Number of deleted chunks
     """
-    should_close = False
     if client is None:
         client = get_weaviate_client()
-        should_close = True
     
     try:
         collection = client.collections.get(COLLECTION_NAME)
         
         # Delete by document_id filter
         result = collection.data.delete_many(
-            where={
-                "path": ["document_id"],
-                "operator": "Equal",
-                "valueText": document_id
-            }
+            where=Filter.by_property("document_id").equal(document_id)
         )
         
         deleted_count = result.matches if hasattr(result, 'matches') else 0
-        logger.info(f"Deleted {deleted_count} chunks for document {document_id}")
+        logger.info("Deleted %s chunks for document %s", deleted_count, document_id)
         return deleted_count
     except Exception as e:
-        logger.error(f"Failed to delete document chunks: {str(e)}")
-        raise
-    finally:
-        if should_close:
-            client.close()
\ No newline at end of file
+        logger.error("Failed to delete document chunks: %s", e)
+        raise
\ No newline at end of file